@@ -0,0 +1,118 @@
+"""
+Measures per-turn round-trip latency of ClientChannelHandler against a stand-in server on the loopback interface,
+compared with a handler that frames messages the way it used to: two sends per message, Nagle's algorithm left on,
+and receives joined from a list of chunks.
+
+Every turn the server sends MOVE followed by a game state message, and waits for the client's reply.
+
+Usage: python -m PythonClientAPI.Benchmarks.ChannelBenchmark [turns] [stage]
+"""
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import PythonClientAPI.Configurator.Constants as constants
+from PythonClientAPI.Benchmarks.GameStates import get_map_names, read_map, create_game_state_message
+from PythonClientAPI.Communication.ClientChannelHandler import ClientChannelHandler, HEADER_SIZE, STRING_ENCODING
+from PythonClientAPI.Communication.Signals import Signals
+from PythonClientAPI.Game.Enums import TileType
+
+MOVE_RESPONSE = '{"uuidToCoreMap": {}}'
+
+
+class LegacyChannelHandler(ClientChannelHandler):
+    def start_socket_connection(self, port_number, host_name):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.connect((host_name, port_number))
+        self.connected = True
+
+    def send_message(self, message):
+        byte_encoded_message = message.encode(STRING_ENCODING)
+        self.sock.sendall(len(byte_encoded_message).to_bytes(HEADER_SIZE, 'big'))
+        self.sock.sendall(byte_encoded_message)
+
+    def buffered_recv(self, size):
+        bytes_read = 0
+        msg_chunks = []
+        while bytes_read < size:
+            new_bytes = self.sock.recv(size - bytes_read)
+            if not new_bytes: raise Exception("Socket was closed by the server")
+            bytes_read += len(new_bytes)
+            msg_chunks.append(new_bytes)
+        return b"".join(msg_chunks)
+
+
+class LoopbackServer(threading.Thread):
+    """
+    Accepts a single client and plays the given number of turns with it, recording the time from sending MOVE
+    to receiving the reply. The server frames messages like the game server, as a single send each.
+    """
+    def __init__(self, message, turns):
+        super().__init__(daemon=True)
+        self.message = message
+        self.turns = turns
+        self.round_trips = []
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('localhost', 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+
+    def run(self):
+        connection, address = self.listener.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        channel = LegacyChannelHandler()
+        channel.sock = connection
+        channel.connected = True
+        with connection:
+            for turn in range(self.turns):
+                start_time = time.perf_counter()
+                connection.sendall(frame(Signals.MOVE.name))
+                connection.sendall(frame(self.message))
+                channel.receive_message()
+                self.round_trips.append(time.perf_counter() - start_time)
+            connection.sendall(frame(Signals.END.name))
+        self.listener.close()
+
+def frame(message):
+    body = message.encode(STRING_ENCODING)
+    return len(body).to_bytes(HEADER_SIZE, 'big') + body
+
+def play(channel_class, message, turns):
+    """
+    :return: round trip time of every turn, in seconds
+    :rtype: list of float
+    """
+    server = LoopbackServer(message, turns)
+    server.start()
+    channel = channel_class()
+    channel.start_socket_connection(server.port, 'localhost')
+    try:
+        while channel.receive_message() == Signals.MOVE.name:
+            channel.receive_message()
+            channel.send_message(MOVE_RESPONSE)
+    finally:
+        channel.sock.close()
+    server.join()
+    return server.round_trips
+
+def run(turns=200, stage='late'):
+    """
+    :return: (name, median, maximum) round trip of the legacy and the current handler
+    :rtype: list of tuple
+    """
+    map_names = get_map_names()
+    tiles = read_map(map_names[0]) if map_names else [[TileType.TILE] * 30 for x in range(30)]
+    message = create_game_state_message(tiles, stage, constants.LOCAL_PLAYER_UUID)
+    results = []
+    for name, channel_class in [("legacy", LegacyChannelHandler), ("current", ClientChannelHandler)]:
+        round_trips = play(channel_class, message, turns)
+        results.append((name, statistics.median(round_trips), max(round_trips)))
+    return results
+
+if __name__ == '__main__':
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    stage = sys.argv[2] if len(sys.argv) > 2 else 'late'
+    for name, median, maximum in run(turns, stage):
+        print("{0}: median {1:.3f} ms, max {2:.3f} ms per turn".format(name, median * 1000, maximum * 1000))
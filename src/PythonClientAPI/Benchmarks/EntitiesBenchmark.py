@@ -0,0 +1,93 @@
+"""
+Compares the slotted entities of PythonClientAPI.Game.Entities against dict-backed classes
+with the previous layout, on memory per object and on set operations like those done by strategy code.
+
+Usage: python -m PythonClientAPI.Benchmarks.EntitiesBenchmark [width] [height]
+"""
+import sys
+import time
+import tracemalloc
+
+from PythonClientAPI.Game.Entities import Tile, FriendlyUnit
+from PythonClientAPI.Game.Enums import Team, MoveResult
+
+
+class DictTile:
+    def __init__(self, position, team, permanent):
+        self.position = position
+        self._team = team
+        self._permanent = permanent
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__) and self.position == other.position)
+
+    def __hash__(self):
+        return 31 + self.position[0] * 31 + self.position[1]
+
+
+class DictUnit:
+    def __init__(self, team, uuid, health, position):
+        self.uuid = uuid
+        self.health = health
+        self.position = position
+        self.team = team
+        self._next_move_target = None
+        self._next_move_type = None
+        self._merged_units_uuid = set()
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.uuid == other.uuid
+
+    def __hash__(self):
+        return hash(self.team) * 31 + hash(self.uuid)
+
+
+def create_tiles(tile_class, width, height):
+    return [tile_class((x, y), Team.NEUTRAL, False) for x in range(width) for y in range(height)]
+
+def create_units(unit_class, count):
+    if unit_class is FriendlyUnit:
+        return [FriendlyUnit('a', 'unit' + str(i), 1, (i, i), MoveResult.MOVE_SUCCESS, []) for i in range(count)]
+    return [unit_class('a', 'unit' + str(i), 1, (i, i)) for i in range(count)]
+
+def measure_memory(create):
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    entities = create()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used, entities
+
+def time_set_operations(entities, repeats=20):
+    # building sets, then the lookups and set algebra done when collecting tiles around units
+    half = len(entities) // 2
+    best = None
+    for i in range(repeats):
+        start_time = time.perf_counter()
+        first = set(entities[:half + half // 2])
+        second = set(entities[half // 2:])
+        for entity in entities:
+            entity in first
+        first & second
+        first | second
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(width, height):
+    results = []
+    for name, baseline_create, slotted_create in [
+            ("tiles", lambda: create_tiles(DictTile, width, height), lambda: create_tiles(Tile, width, height)),
+            ("units", lambda: create_units(DictUnit, width * 10), lambda: create_units(FriendlyUnit, width * 10))]:
+        baseline_memory, baseline = measure_memory(baseline_create)
+        slotted_memory, slotted = measure_memory(slotted_create)
+        results.append((name, len(slotted), baseline_memory, slotted_memory,
+                        time_set_operations(baseline), time_set_operations(slotted)))
+    return results
+
+if __name__ == '__main__':
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else width
+    for name, count, baseline_memory, slotted_memory, baseline_time, slotted_time in run(width, height):
+        print("{0} x{1}: memory {2:.0f} -> {3:.0f} bytes each, set operations {4:.2f} -> {5:.2f} ms".format(
+            name, count, baseline_memory / count, slotted_memory / count, baseline_time * 1000, slotted_time * 1000))
@@ -0,0 +1,86 @@
+"""
+Synthesised game state messages in the format sent by the server, for benchmarking without a running game.
+"""
+import json
+import os
+import random
+
+from PythonClientAPI.Game.Enums import Direction, TileType, MoveResult
+from PythonClientAPI.Navigation.NavigationCompiler import read_bitmap_tiles
+
+MAPS_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'LUMINIS', 'Maps')
+ENEMY_PLAYER_UUID = "ENEMY_PLAYER"
+
+# Fraction of open tiles owned, fraction of owned tiles that are permanent and number of units per team
+GAME_STAGES = {
+    'early': (0.1, 0.0, 8),
+    'mid': (0.5, 0.2, 40),
+    'late': (0.9, 0.5, 120),
+}
+
+
+def get_map_names():
+    """
+    :return: names of the maps shipped in LUMINIS/Maps, or an empty list if they are not available
+    :rtype: list of str
+    """
+    if not os.path.isdir(MAPS_DIRECTORY): return []
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(MAPS_DIRECTORY) if name.endswith('.bmp'))
+
+def read_map(name):
+    """
+    :param str name: name of a map shipped in LUMINIS/Maps
+    :return: grid of TileType indexed as tiles[x][y]
+    """
+    return read_bitmap_tiles(os.path.join(MAPS_DIRECTORY, name + '.bmp'))
+
+def create_initial_state_message(tiles, local_player_uuid):
+    """
+    :return: JSON message sent with GET_READY for the map, in which both players break ties in the order NORTH, EAST, SOUTH, WEST
+    :rtype: str
+    """
+    ordered_directions = [direction.name for direction in (Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST)]
+    return json.dumps({'tiles': [[tile.name for tile in column] for column in tiles],
+                       'uuidToOrderedDirections': {local_player_uuid: ordered_directions,
+                                                   ENEMY_PLAYER_UUID: ordered_directions}})
+
+def create_game_state(tiles, stage, local_player_uuid, seed=0):
+    """
+    Creates a game state in which both teams own half of the tiles and units of the stage,
+    scattered at random over the open tiles.
+
+    :param tiles: grid of TileType indexed as tiles[x][y]
+    :param str stage: key of GAME_STAGES
+    :param str local_player_uuid: uuid of the friendly player
+    :param int seed: seed of the random placement
+    :return: game state as decoded from the server's JSON message
+    :rtype: dict
+    """
+    owned_fraction, permanent_fraction, unit_count = GAME_STAGES[stage]
+    random_generator = random.Random(seed)
+    open_positions = [(x, y) for x in range(len(tiles)) for y in range(len(tiles[0])) if tiles[x][y] != TileType.WALL]
+    random_generator.shuffle(open_positions)
+
+    owned = int(len(open_positions) * owned_fraction) // 2
+    nest_count = max(1, owned // 40)
+    unit_count = min(unit_count, len(open_positions) // 4)
+
+    def as_player(prefix, tile_positions, unit_positions):
+        return {'friendlyUnits': [{'team': prefix, 'uuid': prefix + str(i), 'LF': random_generator.randint(1, 20),
+                                   'position': {'x': p[0], 'y': p[1]}, 'lastMoveResult': MoveResult.MOVE_SUCCESS.name,
+                                   'mergedUnitUuids': []} for i, p in enumerate(unit_positions)],
+                'friendlyTilePositions': [[p[0], p[1], 1 if random_generator.random() < permanent_fraction else 0]
+                                          for p in tile_positions],
+                'friendlyNestPositions': [[p[0], p[1]] for p in tile_positions[:nest_count]]}
+
+    return {'playerUUIDToPlayerTypeMap': {
+                local_player_uuid: as_player('f', open_positions[:owned], random_generator.sample(open_positions, unit_count)),
+                ENEMY_PLAYER_UUID: as_player('e', open_positions[owned:owned * 2], random_generator.sample(open_positions, unit_count))},
+            'playerIndexToUUIDMap': {'0': local_player_uuid, '1': ENEMY_PLAYER_UUID}}
+
+def create_game_state_message(tiles, stage, local_player_uuid, seed=0):
+    """
+    :return: JSON message of create_game_state
+    :rtype: str
+    """
+    return json.dumps(create_game_state(tiles, stage, local_player_uuid, seed))
@@ -0,0 +1,65 @@
+"""
+Times decoding of game state messages with every available JSON decoder, both the decoding alone
+and the whole of JSON.parse_game_state as done by the client each turn.
+
+Messages are read from a file holding one recorded game state message per line, together with the map
+they were recorded on, or synthesised as late-game states on the shipped maps.
+
+Usage: python -m PythonClientAPI.Benchmarks.JSONBenchmark [map name] [recorded messages file]
+"""
+import sys
+import time
+
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Benchmarks.GameStates import get_map_names, read_map, create_game_state_message
+from PythonClientAPI.Game.WorldModel import WorldModel
+
+
+def read_messages(file):
+    with open(file, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def time_decoder(name, tiles, messages, repeats=5):
+    """
+    :return: best time to decode all messages, and best time to parse them into Worlds with a WorldModel
+    :rtype: (float, float)
+    """
+    JSON.set_json_decoder(name)
+    try:
+        decode_time = parse_time = None
+        for i in range(repeats):
+            start_time = time.perf_counter()
+            for message in messages:
+                JSON.decode_json(message)
+            elapsed = time.perf_counter() - start_time
+            decode_time = elapsed if decode_time is None else min(decode_time, elapsed)
+
+            world_model = WorldModel(tiles)
+            start_time = time.perf_counter()
+            for message in messages:
+                JSON.parse_game_state(message, tiles, world_model)
+            elapsed = time.perf_counter() - start_time
+            parse_time = elapsed if parse_time is None else min(parse_time, elapsed)
+        return decode_time, parse_time
+    finally:
+        JSON.set_json_decoder()
+
+def run(map_name, messages=None, turns=10):
+    """
+    :param str map_name: name of a shipped map
+    :param list messages: recorded game state messages, or None to synthesise late-game ones
+    :return: (decoder name, decode time, parse time) of every available decoder
+    :rtype: list of tuple
+    """
+    tiles = read_map(map_name)
+    if messages is None:
+        messages = [create_game_state_message(tiles, 'late', constants.LOCAL_PLAYER_UUID, seed) for seed in range(turns)]
+    return [(name,) + time_decoder(name, tiles, messages) for name in JSON.get_json_decoders()]
+
+if __name__ == '__main__':
+    map_names = sys.argv[1:2] or get_map_names()
+    messages = read_messages(sys.argv[2]) if len(sys.argv) > 2 else None
+    for map_name in map_names:
+        for name, decode_time, parse_time in run(map_name, messages):
+            print("{0} with {1}: decode {2:.2f} ms, parse {3:.2f} ms".format(map_name, name, decode_time * 1000, parse_time * 1000))
@@ -0,0 +1,142 @@
+"""
+Stand-in for the game server on asyncio, speaking the same BEGIN/GET_READY/MOVE/END protocol with size-prefixed
+messages. Every client that connects plays its own game against an enemy that never moves, on synthesised game
+states that go from early to late game over the turns. This allows many clients to be run in one process
+for load and latency testing without the Java server.
+
+Usage: python -m PythonClientAPI.Benchmarks.MockServer [clients] [turns] [map name]
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import PythonClientAPI.Configurator.Constants as constants
+from PythonClientAPI.Benchmarks.GameStates import get_map_names, read_map, create_game_state_message
+from PythonClientAPI.Communication.AsyncClientChannelHandler import AsyncClientChannelHandler
+from PythonClientAPI.Communication.AsyncClientHandlerProtocol import AsyncClientHandlerProtocol
+from PythonClientAPI.Communication.Signals import Signals
+from PythonClientAPI.Game.Enums import Direction, TileType
+
+
+class MockServer:
+    """
+    :ivar list round_trips: for every game played, the time from sending MOVE to receiving the reply of every turn
+    :ivar list responses: for every game played, the reply of every turn
+    """
+    def __init__(self, tiles, turns, ordered_directions=Direction.ORDERED_DIRECTIONS):
+        self.tiles = tiles
+        self.turns = turns
+        self.ordered_directions = ordered_directions
+        self.round_trips = []
+        self.responses = []
+        self.port = None
+        self._server = None
+        self._messages = {}
+
+    async def start(self, host_name='localhost', port_number=0):
+        self._server = await asyncio.start_server(self.play, host_name, port_number)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def get_messages(self, uuid):
+        """
+        :return: initial state message and game state message of every turn for the player with uuid
+        :rtype: (str, list of str)
+        """
+        if not (uuid in self._messages):
+            initial_state = json.dumps({
+                'tiles': [[tile.name for tile in column] for column in self.tiles],
+                'uuidToOrderedDirections': {uuid: [direction.name for direction in self.ordered_directions]}})
+            game_states = [create_game_state_message(self.tiles, get_stage(turn, self.turns), uuid, turn)
+                           for turn in range(self.turns)]
+            self._messages[uuid] = (initial_state, game_states)
+        return self._messages[uuid]
+
+    async def play(self, reader, writer):
+        channel = AsyncClientChannelHandler()
+        channel.reader, channel.writer = reader, writer
+        channel.connected = True
+        round_trips = []
+        responses = []
+        self.round_trips.append(round_trips)
+        self.responses.append(responses)
+        try:
+            await channel.send_message(Signals.BEGIN.name)
+            initial_state, game_states = self.get_messages(await channel.receive_message())
+
+            await channel.send_message(Signals.GET_READY.name)
+            await channel.send_message(initial_state)
+            if await channel.receive_message() != Signals.READY.name:
+                raise Exception("Client did not get ready")
+
+            for game_state in game_states:
+                start_time = time.perf_counter()
+                await channel.send_message(Signals.MOVE.name)
+                await channel.send_message(game_state)
+                responses.append(await channel.receive_message())
+                round_trips.append(time.perf_counter() - start_time)
+
+            await channel.send_message(Signals.END.name)
+        finally:
+            channel.close_connection()
+
+
+class StandInAI:
+    """
+    Sends every unit to the closest tile it can capture, which exercises decoding, path-finding and move encoding.
+    """
+    def do_move(self, world, friendly_units, enemy_units):
+        for unit in friendly_units:
+            tile = world.get_closest_capturable_tile_from(unit.position, None)
+            if tile: world.move(unit, tile.position)
+
+
+def get_stage(turn, turns):
+    return 'early' if turn < turns // 3 else 'mid' if turn < turns * 2 // 3 else 'late'
+
+async def play_games(tiles, clients, turns, create_player_ai=StandInAI, max_response_time=600):
+    """
+    Plays one game for each client concurrently against a MockServer.
+
+    :return: the server, holding the round trips and responses of every game
+    :rtype: MockServer
+    """
+    server = MockServer(tiles, turns)
+    await server.start()
+    try:
+        protocols = [AsyncClientHandlerProtocol(create_player_ai(), server.port, max_response_time,
+                                                constants.LOCAL_PLAYER_UUID, 'localhost', client)
+                     for client in range(clients)]
+        await asyncio.gather(*[protocol.start_communications() for protocol in protocols])
+    finally:
+        await server.close()
+    return server
+
+def run(clients=4, turns=30, map_name=None, create_player_ai=StandInAI, max_response_time=600):
+    """
+    :return: the server, holding the round trips and responses of every game
+    :rtype: MockServer
+    """
+    map_names = get_map_names()
+    if map_name is None and map_names: map_name = map_names[0]
+    tiles = read_map(map_name) if map_name else [[TileType.TILE] * 30 for x in range(30)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(play_games(tiles, clients, turns, create_player_ai, max_response_time))
+    finally:
+        loop.close()
+
+if __name__ == '__main__':
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    server = run(clients, turns, sys.argv[3] if len(sys.argv) > 3 else None)
+    round_trips = sorted(round_trip for game in server.round_trips for round_trip in game)
+    print("{0} clients, {1} turns: median {2:.2f} ms, p95 {3:.2f} ms, max {4:.2f} ms per turn".format(
+        clients, turns, statistics.median(round_trips) * 1000,
+        round_trips[int(len(round_trips) * 0.95)] * 1000, round_trips[-1] * 1000))
@@ -0,0 +1,144 @@
+"""
+Times the PlayerAPI queries that strategy code makes every turn on each shipped map, at every stage of GAME_STAGES:
+JSON decoding, World construction, get_shortest_path, every get_closest_*_from and the nest clusters.
+Every game state is decoded into a new World, so queries are timed from cold per-turn caches as during a game,
+and each query is made once from the position of every friendly unit.
+
+The report maps map name, stage and query to the median milliseconds over all game states. It can be written
+as JSON and compared with a previous report, in which case queries that got slower are flagged.
+
+Usage: python -m PythonClientAPI.Benchmarks.PlayerAPIBenchmark [-o report.json] [-b baseline.json] [-t turns] [map name]...
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Benchmarks.GameStates import GAME_STAGES, get_map_names, read_map, create_game_state_message
+from PythonClientAPI.Game.Enums import TileType
+from PythonClientAPI.Game.WorldModel import WorldModel
+
+# Queries made from the position of every friendly unit
+UNIT_QUERIES = [
+    'get_closest_enemy_from',
+    'get_closest_friendly_from',
+    'get_closest_neutral_tile_from',
+    'get_closest_enemy_tile_from',
+    'get_closest_capturable_tile_from',
+    'get_closest_friendly_tile_from',
+    'get_closest_friendly_nest_from',
+    'get_closest_enemy_nest_from',
+]
+# Queries made once per World
+WORLD_QUERIES = ['get_friendly_nest_clusters', 'get_enemy_nest_clusters']
+QUERIES = ['decode', 'build_world', 'get_shortest_path'] + UNIT_QUERIES + WORLD_QUERIES
+# A query is flagged when it is this much slower than in the baseline, and by more than REGRESSION_MINIMUM ms
+REGRESSION_RATIO = 1.2
+REGRESSION_MINIMUM = 0.05
+
+
+def time_queries(tiles, message, world_model, seed=0):
+    """
+    :return: milliseconds taken by each of QUERIES on the game state in message
+    :rtype: dict
+    """
+    timings = {}
+    start_time = time.perf_counter()
+    game_state = JSON.decode_json(message)
+    timings['decode'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    decoded_game_data = JSON.as_any_game_state(game_state, tiles, world_model)
+    timings['build_world'] = time.perf_counter() - start_time
+
+    world = decoded_game_data.world
+    positions = [unit.position for unit in
+                 decoded_game_data.player_uuid_to_player_type_map[constants.LOCAL_PLAYER_UUID].friendly_units]
+    random_generator = random.Random(seed)
+    open_positions = [(x, y) for x in range(len(tiles)) for y in range(len(tiles[0])) if tiles[x][y] != TileType.WALL]
+    targets = [random_generator.choice(open_positions) for position in positions]
+
+    start_time = time.perf_counter()
+    for position, target in zip(positions, targets):
+        world.get_shortest_path(position, target, None)
+    timings['get_shortest_path'] = time.perf_counter() - start_time
+
+    for name in UNIT_QUERIES:
+        query = getattr(world, name)
+        start_time = time.perf_counter()
+        for position in positions:
+            query(position, None)
+        timings[name] = time.perf_counter() - start_time
+
+    for name in WORLD_QUERIES:
+        start_time = time.perf_counter()
+        getattr(world, name)()
+        timings[name] = time.perf_counter() - start_time
+
+    return {name: elapsed * 1000 for name, elapsed in timings.items()}
+
+def benchmark_map(map_name, turns=5):
+    """
+    :return: median milliseconds of each of QUERIES, keyed by stage
+    :rtype: dict
+    """
+    tiles = read_map(map_name)
+    report = {}
+    for stage in GAME_STAGES:
+        world_model = WorldModel(tiles)
+        all_timings = [time_queries(tiles, create_game_state_message(tiles, stage, constants.LOCAL_PLAYER_UUID, seed),
+                                    world_model, seed) for seed in range(turns)]
+        report[stage] = {name: round(statistics.median(timings[name] for timings in all_timings), 4) for name in QUERIES}
+    return report
+
+def find_regressions(report, baseline):
+    """
+    :return: (map name, stage, query, baseline ms, ms) of every query slower than in baseline
+    :rtype: list of tuple
+    """
+    regressions = []
+    for map_name, stages in report.items():
+        for stage, timings in stages.items():
+            for name, elapsed in timings.items():
+                previous = baseline.get(map_name, {}).get(stage, {}).get(name)
+                if previous is not None and elapsed > previous * REGRESSION_RATIO and elapsed - previous > REGRESSION_MINIMUM:
+                    regressions.append((map_name, stage, name, previous, elapsed))
+    return regressions
+
+def run(map_names=None, turns=5):
+    """
+    :return: report of benchmark_map for every map, keyed by map name
+    :rtype: dict
+    """
+    return {map_name: benchmark_map(map_name, turns) for map_name in (map_names or get_map_names())}
+
+def print_report(report):
+    for map_name, stages in report.items():
+        print(map_name)
+        print("    {0:<34}".format("query") + "".join("{0:>10}".format(stage) for stage in stages))
+        for name in QUERIES:
+            print("    {0:<34}".format(name) + "".join("{0:>10.3f}".format(stages[stage][name]) for stage in stages))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Times PlayerAPI queries on the shipped maps")
+    parser.add_argument('maps', nargs='*', help="names of the maps to benchmark, all shipped maps by default")
+    parser.add_argument('-o', '--output', help="file to write the report to as JSON")
+    parser.add_argument('-b', '--baseline', help="report to compare with")
+    parser.add_argument('-t', '--turns', type=int, default=5, help="game states per map and stage")
+    arguments = parser.parse_args()
+
+    report = run(arguments.maps, arguments.turns)
+    print_report(report)
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if arguments.baseline:
+        with open(arguments.baseline) as f:
+            regressions = find_regressions(report, json.load(f))
+        for map_name, stage, name, previous, elapsed in regressions:
+            print("REGRESSION {0} {1} {2}: {3:.3f} -> {4:.3f} ms".format(map_name, stage, name, previous, elapsed))
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,112 @@
+"""
+Replays a game recorded with -rec against one or more PlayerAIs without the server. Every recorded game state
+is fed to do_move in order, the time do_move takes is measured and the moves it makes are compared with the
+ones sent during the recorded game. The deadline is not enforced and the random module is reseeded before
+every replay, so an AI that does not read the clock makes the same moves on every replay.
+
+Each PlayerAI is given as the directory holding its PlayerAI.py, such as src or src/snap_1.
+
+Usage: python -m PythonClientAPI.Benchmarks.Replay <recording> [PlayerAI directory]...
+"""
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import PythonClientAPI.Communication.CommunicatorConstants as cc
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Communication.AIHandlerThread import get_player_move
+from PythonClientAPI.Communication.ClientHandlerProtocol import ClientHandlerProtocol
+from PythonClientAPI.Communication.GameRecorder import read_recording
+from PythonClientAPI.Communication.Signals import Signals
+
+
+def load_player_ai(directory):
+    """
+    :param str directory: directory holding a PlayerAI.py
+    :return: a new instance of the PlayerAI class defined in it
+    """
+    file = os.path.join(directory, 'PlayerAI.py')
+    spec = importlib.util.spec_from_file_location('PlayerAI_' + str(abs(hash(os.path.abspath(file)))), file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.PlayerAI()
+
+def get_move_targets(response):
+    """
+    :param str response: message sent in reply to a game state
+    :return: target of every unit moved, keyed by uuid
+    :rtype: dict
+    """
+    if response == Signals.NO_RESPONSE.name:
+        return {}
+    core_map = json.loads(response)['uuidToCoreMap']
+    return {uuid: (unit['nextMoveTarget']['x'], unit['nextMoveTarget']['y']) for uuid, unit in core_map.items()}
+
+def diff_moves(expected, actual):
+    """
+    :return: uuids of the units moved differently, or moved in only one of the responses
+    :rtype: list of str
+    """
+    expected_targets = get_move_targets(expected)
+    actual_targets = get_move_targets(actual)
+    return sorted(uuid for uuid in expected_targets.keys() | actual_targets.keys()
+                  if expected_targets.get(uuid) != actual_targets.get(uuid))
+
+def replay(recording, player_ai, seed=0):
+    """
+    :param Recording recording: game as returned by read_recording
+    :return: for every turn, a dict with its 'turn', the milliseconds do_move took as 'time', the 'response'
+        and the uuids of the units moved differently from the recorded response as 'differences'
+    :rtype: list of dict
+    """
+    local_player_uuid = constants.LOCAL_PLAYER_UUID
+    constants.LOCAL_PLAYER_UUID = recording.uuid
+    random.seed(seed)
+    try:
+        protocol = ClientHandlerProtocol(player_ai, cc.PORT_NUMBER, recording.max_response_time, recording.uuid)
+        protocol.prepare_initial_state(JSON.parse_initial_state(recording.initial_state_message, recording.uuid))
+
+        results = []
+        for turn in recording.turns:
+            game_state = JSON.parse_game_state(turn['message'], protocol.tiles, protocol.world_model)
+            start_time = time.perf_counter()
+            player_move = get_player_move(player_ai, game_state)
+            elapsed = (time.perf_counter() - start_time) * 1000
+            response = player_move if isinstance(player_move, str) else json.dumps(player_move, cls=JSON.FFEncoder)
+            results.append({'turn': turn['turn'], 'time': elapsed, 'response': response,
+                            'differences': diff_moves(turn['response'], response)})
+        return results
+    finally:
+        constants.LOCAL_PLAYER_UUID = local_player_uuid
+
+def summarise(name, results, max_response_time):
+    times = sorted(result['time'] for result in results)
+    print("{0}: {1} turns, median {2:.1f} ms, max {3:.1f} ms, {4} over {5} ms, {6} turns with different moves".format(
+        name, len(results), statistics.median(times) if times else 0, times[-1] if times else 0,
+        sum(1 for t in times if t > max_response_time), max_response_time,
+        sum(1 for result in results if result['differences'])))
+
+def run(recording_file, player_ai_directories):
+    """
+    :return: results of replay for every PlayerAI directory, in order
+    :rtype: list of list
+    """
+    recording = read_recording(recording_file)
+    print("Replaying {0} turns played as {1}".format(len(recording.turns), recording.uuid))
+    all_results = []
+    for directory in player_ai_directories:
+        results = replay(recording, load_player_ai(directory))
+        summarise(directory, results, recording.max_response_time)
+        all_results.append(results)
+    return all_results
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    run(sys.argv[1], sys.argv[2:] or [os.path.join(os.path.dirname(__file__), '..', '..')])
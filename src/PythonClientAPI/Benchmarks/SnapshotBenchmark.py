@@ -0,0 +1,147 @@
+"""
+Runs every snapshot of the strategy, src/PlayerAI.py and src/snap_N/PlayerAI.py, on the same game states and
+reports the p50, p95 and max latency of do_move against the number of friendly units. Snapshots that would
+exceed the response budget on any game state are flagged: the time the client gives do_move before sending the
+moves assigned so far, which is the maximum response time of the match preset less a safety margin.
+
+Game states are replayed from a recording made with -rec, or synthesised on the map of the preset, going from
+early to late game. Output of the snapshots is discarded while they run.
+
+Usage: python -m PythonClientAPI.Benchmarks.SnapshotBenchmark [-r recording] [-t turns] [-p preset] [snapshot directory]...
+"""
+import argparse
+import contextlib
+import math
+import os
+import sys
+
+import PythonClientAPI.Communication.CommunicatorConstants as cc
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Benchmarks.GameStates import GAME_STAGES, read_map, create_initial_state_message, \
+    create_game_state_message
+from PythonClientAPI.Benchmarks.Replay import load_player_ai, replay
+from PythonClientAPI.Communication.GameRecorder import Recording, read_recording
+from PythonClientAPI.Communication.Signals import Signals
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', '..')
+MATCH_PRESET = os.path.join(SOURCE_DIRECTORY, '..', 'LUMINIS', 'MatchPresets', 'default.json')
+
+
+def get_snapshot_directories():
+    """
+    :return: directories holding a snapshot of the strategy, the current one first
+    :rtype: list of str
+    """
+    snapshots = sorted((name for name in os.listdir(SOURCE_DIRECTORY) if name.startswith('snap_')),
+                       key=lambda name: int(name[len('snap_'):]) if name[len('snap_'):].isdigit() else math.inf)
+    directories = [SOURCE_DIRECTORY] + [os.path.join(SOURCE_DIRECTORY, name) for name in snapshots]
+    return [directory for directory in directories if os.path.isfile(os.path.join(directory, 'PlayerAI.py'))]
+
+def get_snapshot_name(directory):
+    name = os.path.basename(os.path.normpath(directory))
+    return name if name.startswith('snap_') else 'PlayerAI'
+
+def read_match_preset(file=MATCH_PRESET):
+    """
+    :return: the match preset, as in LUMINIS/MatchPresets
+    :rtype: dict
+    """
+    with open(file, 'r') as f:
+        return JSON.decode_json(f.read())
+
+def create_recording(map_name, turns, max_response_time):
+    """
+    :return: a Recording of turns synthesised game states for each stage of GAME_STAGES, in order
+    :rtype: Recording
+    """
+    tiles = read_map(map_name)
+    uuid = constants.LOCAL_PLAYER_UUID
+    messages = [create_game_state_message(tiles, stage, uuid, seed) for stage in GAME_STAGES for seed in range(turns)]
+    return Recording(uuid, max_response_time, create_initial_state_message(tiles, uuid),
+                     [{'turn': turn, 'message': message, 'response': Signals.NO_RESPONSE.name, 'responded': True}
+                      for turn, message in enumerate(messages)])
+
+def get_unit_count(message, uuid):
+    return len(JSON.decode_json(message)['playerUUIDToPlayerTypeMap'][uuid]['friendlyUnits'])
+
+def get_percentile(sorted_values, percentile):
+    return sorted_values[max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)]
+
+def benchmark_snapshot(recording, player_ai):
+    """
+    :param Recording recording: game states to run player_ai on
+    :return: for every number of friendly units, the 'turns' with that many, the 'p50', 'p95' and 'max' do_move
+        latency over them in milliseconds and the number of turns on which do_move raised as 'errors'
+    :rtype: dict
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        results = replay(recording, player_ai)
+
+    unit_count_to_results = {}
+    for turn, result in zip(recording.turns, results):
+        unit_count_to_results.setdefault(get_unit_count(turn['message'], recording.uuid), []).append(result)
+
+    latencies = {}
+    for unit_count, unit_count_results in sorted(unit_count_to_results.items()):
+        times = sorted(result['time'] for result in unit_count_results)
+        latencies[unit_count] = {'turns': len(times), 'p50': get_percentile(times, 50), 'p95': get_percentile(times, 95),
+                                 'max': times[-1],
+                                 'errors': sum(1 for result in unit_count_results
+                                               if result['response'] == Signals.NO_RESPONSE.name)}
+    return latencies
+
+def get_budget(max_response_time):
+    """
+    :return: milliseconds do_move may take in a game with max_response_time, as cut off by the client
+    :rtype: float
+    """
+    return cc.get_response_budget(max_response_time) * 1000
+
+def is_too_slow(latencies, max_response_time):
+    budget = get_budget(max_response_time)
+    return any(unit_count_latencies['max'] > budget for unit_count_latencies in latencies.values())
+
+def run(snapshot_directories=None, recording_file=None, map_name=None, turns=3, max_response_time=None):
+    """
+    :param list snapshot_directories: directories holding a PlayerAI.py, get_snapshot_directories() by default
+    :param str recording_file: recording to replay, or None to synthesise game states on map_name
+    :param str map_name: map to synthesise game states on, the one of the match preset by default
+    :param int turns: game states to synthesise per stage
+    :param int max_response_time: milliseconds, the one of the match preset by default
+    :return: snapshot name, result of benchmark_snapshot and whether it is too slow, for every snapshot
+    :rtype: list of (str, dict, bool)
+    """
+    if map_name is None or max_response_time is None:
+        preset = read_match_preset()
+        map_name = map_name or preset['mapName']
+        max_response_time = max_response_time or int(preset['maxResponseTime'])
+    recording = read_recording(recording_file) if recording_file else create_recording(map_name, turns, max_response_time)
+
+    results = []
+    for directory in snapshot_directories or get_snapshot_directories():
+        latencies = benchmark_snapshot(recording, load_player_ai(directory))
+        results.append((get_snapshot_name(directory), latencies, is_too_slow(latencies, max_response_time)))
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reports do_move latency of every strategy snapshot")
+    parser.add_argument('snapshots', nargs='*', help="directories holding a PlayerAI.py, every snapshot by default")
+    parser.add_argument('-r', '--recording', help="recording to replay instead of synthesised game states")
+    parser.add_argument('-m', '--map', help="map to synthesise game states on, the one of the preset by default")
+    parser.add_argument('-t', '--turns', type=int, default=3, help="game states to synthesise per stage")
+    parser.add_argument('-p', '--preset', default=MATCH_PRESET, help="match preset to read the maximum response time from")
+    arguments = parser.parse_args()
+
+    preset = read_match_preset(arguments.preset)
+    max_response_time = int(preset['maxResponseTime'])
+    results = run(arguments.snapshots, arguments.recording, arguments.map or preset['mapName'], arguments.turns,
+                  max_response_time)
+    for name, latencies, too_slow in results:
+        print("{0}{1}".format(name, " EXCEEDS the {0:.0f} ms budget of a {1} ms maximum response time".format(
+            get_budget(max_response_time), max_response_time) if too_slow else ""))
+        print("    {0:>6}{1:>7}{2:>10}{3:>10}{4:>10}{5:>8}".format("units", "turns", "p50", "p95", "max", "errors"))
+        for unit_count, unit_count_latencies in latencies.items():
+            print("    {0:>6}{turns:>7}{p50:>10.1f}{p95:>10.1f}{max:>10.1f}{errors:>8}".format(
+                unit_count, **unit_count_latencies))
+    sys.exit(1 if any(too_slow for name, latencies, too_slow in results) else 0)
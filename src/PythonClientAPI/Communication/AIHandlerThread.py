@@ -1,6 +1,5 @@
 import cProfile
-import io
-import pstats
+import queue
 import sys
 import threading
 import traceback
@@ -8,38 +7,104 @@ import time
 
 from PythonClientAPI.Communication.Signals import Signals
 from PythonClientAPI.Configurator import Constants
+from PythonClientAPI.Game.JSON import as_move_dct
 from PythonClientAPI.Game.GameState import PlayerTurnActionInfo
 from PythonClientAPI.Game.Enums import MoveType
 
 
-class AIHandlerThread(threading.Thread):
-    def __init__(self, group=None, target=None, name=None, args=(), kwargs={}, daemon=None):
-        threading.Thread.__init__(self, group=group, target=target, daemon=daemon, args=args, kwargs=kwargs)
+def get_player_move(player_ai, decoded_game_data, profile_file=None):
+    """
+    Runs player_ai.do_move on a game state.
+
+    :param str profile_file: file to write cProfile stats of do_move to, or None to run it without profiling
+    :return: the moves assigned to friendly units, or Signals.NO_RESPONSE.name if do_move raised an exception
+    :rtype: PlayerTurnActionInfo or str
+    """
+    friendly_units = decoded_game_data.player_uuid_to_player_type_map[Constants.LOCAL_PLAYER_UUID].friendly_units
+    enemy_units = decoded_game_data.player_uuid_to_player_type_map[decoded_game_data.enemy_uuid].friendly_units
+    friendly_units.sort(key=lambda unit: unit.health)
+    enemy_units.sort(key=lambda unit: unit.health)
+    try:
+        start_time = time.time()
+        if profile_file:
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(player_ai.do_move, decoded_game_data.world, friendly_units, enemy_units)
+            finally:
+                profile.dump_stats(profile_file)
+        else:
+            player_ai.do_move(decoded_game_data.world, friendly_units, enemy_units)
+
+        player_move = get_assigned_moves(decoded_game_data)
+        end_time = time.time()
+        print("[TIME] " + str(round((end_time - start_time) * 1000)) + " ms")
+        return player_move
+    except:
+        print("An exception occurred in calling do_move: \n", file=sys.stderr)
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        traceback.print_exception(exc_type, exc_value, exc_traceback,
+                                  file=sys.stderr)
+        return Signals.NO_RESPONSE.name
+
+
+def get_assigned_moves(decoded_game_data):
+    """
+    Collects the moves assigned to friendly units so far. This may be called while do_move is still running,
+    in which case the moves it assigns afterwards are not included: every move is copied into a plain dict
+    as it stands now, rather than referring to units that do_move may keep moving.
+
+    :rtype: PlayerTurnActionInfo
+    """
+    friendly_units = list(decoded_game_data.player_uuid_to_player_type_map[Constants.LOCAL_PLAYER_UUID].friendly_units)
+    moves = {}
+    for unit in friendly_units:
+        # World.move sets the target before the type, so the type is derived from the target read once
+        # instead of reading both while they may be changing
+        target = unit.get_next_move_target()
+        if target is not None and target != unit.position:
+            moves[unit.uuid] = as_move_dct(unit, MoveType.MOVE, target)
+    return PlayerTurnActionInfo(moves)
+
+
+class AIWorkerThread(threading.Thread):
+    """
+    Long-lived thread that runs do_move on every game state submitted to it, one at a time.
+    The move of the last state is kept in player_move, and player_move_event is set once it is ready.
+    """
+    def __init__(self, player_ai):
+        threading.Thread.__init__(self, daemon=True)
+        self.player_ai = player_ai
         self.player_move = Signals.NO_RESPONSE.name
+        self.player_move_event = threading.Event()
+        self._game_states = queue.Queue()
 
     def run(self):
-        player_ai = self._kwargs['player_ai']
-        decoded_game_data = self._kwargs['decoded_game_data']
-        player_move_event = self._kwargs['player_move_event']
-        friendly_units = decoded_game_data.player_uuid_to_player_type_map[Constants.LOCAL_PLAYER_UUID].friendly_units
-        enemy_units = decoded_game_data.player_uuid_to_player_type_map[decoded_game_data.enemy_uuid].friendly_units
-        friendly_units.sort(key=lambda unit: unit.health)
-        enemy_units.sort(key=lambda unit: unit.health)
-        try:
-            start_time = time.time()
-            player_ai.do_move(decoded_game_data.world, friendly_units, enemy_units)
+        while True:
+            decoded_game_data, profile_file = self._game_states.get()
+            if decoded_game_data is None: return
+            self.player_move = get_player_move(self.player_ai, decoded_game_data, profile_file)
+            self.player_move_event.set()
 
-            self.player_move = PlayerTurnActionInfo({unit.uuid: unit for unit in friendly_units if unit.get_next_move_type() == MoveType.MOVE})
-            end_time = time.time()
-            print("[TIME] " + str(round((end_time - start_time) * 1000)) + " ms")
+    def submit(self, decoded_game_data, profile_file=None):
+        """
+        Hands a game state to the worker. Must only be called once the move of the previous state is ready.
 
-            player_move_event.set()
-        except:
-            print("An exception occurred in calling do_move: \n", file=sys.stderr)
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            traceback.print_exception(exc_type, exc_value, exc_traceback,
-                                      file=sys.stderr)
-            player_move_event.set()
+        :param str profile_file: file to write cProfile stats of do_move to, or None to run it without profiling
+        """
+        self.player_move_event.clear()
+        self.player_move = Signals.NO_RESPONSE.name
+        self._game_states.put((decoded_game_data, profile_file))
+
+    def wait_for_move(self, timeout):
+        """
+        :param float timeout: seconds to wait for at most
+        :return: True iff the move of the last state submitted is ready
+        :rtype: bool
+        """
+        return self.player_move_event.wait(timeout)
 
     def get_move(self):
         return self.player_move
+
+    def stop(self):
+        self._game_states.put((None, None))
@@ -0,0 +1,51 @@
+import asyncio
+
+from PythonClientAPI.Communication.ClientChannelHandler import HEADER_SIZE, STRING_ENCODING
+
+
+class AsyncClientChannelHandler():
+    """
+    Sends and receives size-prefixed messages like ClientChannelHandler, over asyncio streams.
+    """
+    def __init__(self):
+        self.connected = False
+
+    async def start_socket_connection(self, port_number, host_name):
+        try:
+            # asyncio turns Nagle's algorithm off on TCP streams already
+            self.reader, self.writer = await asyncio.open_connection(host_name, port_number)
+            self.connected = True
+            print("Connected")
+        except OSError:
+            print("Cannot connect to  {0} at port {1}. Check to see that the server is running.".format(host_name,
+                                                                                                        port_number))
+
+    def close_connection(self):
+        self.writer.close()
+        self.connected = False
+        print("Connection closed")
+
+    async def send_message(self, message):
+        self.check_socket_connection()
+        try:
+            byte_encoded_message = message.encode(STRING_ENCODING)
+            self.writer.write(len(byte_encoded_message).to_bytes(HEADER_SIZE, 'big') + byte_encoded_message)
+            await self.writer.drain()
+        except OSError:
+            self.close_connection()
+            raise Exception("Socket failed to send. Closing socket")
+
+    async def receive_message(self):
+        self.check_socket_connection()
+        try:
+            size_bytes = await self.reader.readexactly(HEADER_SIZE)
+            message_bytes = await self.reader.readexactly(int.from_bytes(size_bytes, byteorder='big'))
+        except asyncio.IncompleteReadError:
+            self.close_connection()
+            raise Exception("Socket was closed by the server. Closing socket")
+
+        return str(message_bytes, STRING_ENCODING).strip()
+
+    def check_socket_connection(self):
+        if not self.connected:
+            raise Exception("Cannot send or receive message on closed socket")
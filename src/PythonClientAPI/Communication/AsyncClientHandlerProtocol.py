@@ -0,0 +1,111 @@
+import asyncio
+import json
+import time
+
+import PythonClientAPI.Communication.CommunicatorConstants as cc
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Communication.AIHandlerThread import get_player_move, get_assigned_moves
+from PythonClientAPI.Communication.AsyncClientChannelHandler import AsyncClientChannelHandler
+from PythonClientAPI.Communication.ClientHandlerProtocol import ClientHandlerProtocol
+from PythonClientAPI.Communication.Signals import Signals
+
+
+class AsyncClientHandlerProtocol(ClientHandlerProtocol):
+    """
+    Client protocol on asyncio streams, answering the same signals as ClientHandlerProtocol.
+    Many clients can share one event loop, each running its AI on the loop's default executor.
+
+    Clients in the same process share the player uuid, direction order and navigation data,
+    which are process-wide, so they should all be playing as the same player on the same map.
+    Each should be given its own client_index so that the files it records into are its own.
+    """
+    def __init__(self, player_ai, port_number, max_response_time, uuidString, host_name=cc.HOST_NAME, client_index=None):
+        super().__init__(player_ai, port_number, max_response_time, uuidString, client_index)
+        self.port_number = port_number
+        self.host_name = host_name
+        self.pending_move = None
+
+    async def start_connection(self):
+        self.client_channel_handler = AsyncClientChannelHandler()
+        await self.client_channel_handler.start_socket_connection(self.port_number, self.host_name)
+
+    async def receive_message(self):
+        message = ''
+        while message == '':
+            message = await self.client_channel_handler.receive_message()
+        return message
+
+    async def communication_protocol(self):
+        while (self.game_is_ongoing):
+            message_from_server = await self.receive_message()
+            await self.relay_message_and_respond_to(message_from_server)
+
+    async def start_communications(self):
+        await self.start_connection()
+        self.game_is_ongoing = True
+        await self.communication_protocol()
+
+    async def relay_message_and_respond_to(self, message_from_server):
+        if message_from_server == Signals.BEGIN.name:
+            await self.client_channel_handler.send_message(self.client_uuid)
+        elif message_from_server == Signals.MOVE.name:
+            await self.next_move_from_client()
+        elif message_from_server == Signals.END.name:
+            self.end_communications()
+        elif message_from_server == Signals.GET_READY.name:
+            game_initial_state = await self.client_channel_handler.receive_message()
+            if self.recorder: self.recorder.record_initial_state(game_initial_state)
+            self.prepare_initial_state(JSON.parse_initial_state(game_initial_state, self.client_uuid))
+            await self.client_channel_handler.send_message(Signals.READY.name)
+        else:
+            self.end_communications()
+            raise Exception("Unrecognized signal received from server {0}".format(message_from_server))
+
+    async def next_move_from_client(self):
+        turn = self.turn
+        game_data_from_server = await self.client_channel_handler.receive_message()
+        received_time = time.time()
+        decoded_game_data = JSON.parse_game_state(game_data_from_server, self.tiles, self.world_model)
+        decoded_game_data.world.set_deadline(received_time + cc.get_response_budget())
+
+        client_move = await self.get_timed_ai_response(decoded_game_data)
+
+        if isinstance(client_move, str):
+            client_move_json = client_move
+        else:
+            client_move_json = json.dumps(client_move, cls=JSON.FFEncoder)
+
+        await self.client_channel_handler.send_message(client_move_json)
+
+        if self.recorder:
+            self.recorder.record_turn(turn, game_data_from_server, client_move_json, self.ai_responded)
+        if self.api_statistics is not None:
+            self.api_statistics.append((turn, decoded_game_data.world.get_api_statistics()))
+
+    async def get_timed_ai_response(self, game_data):
+        # like the threaded protocol, an AI that timed out keeps working on its old state and is waited on again next turn
+        submitted = self.pending_move is None
+        if submitted:
+            self.pending_move = asyncio.get_running_loop().run_in_executor(None, get_player_move, self.player_ai, game_data)
+
+        start_time = time.time()
+        if game_data.world.deadline is None:
+            game_data.world.set_deadline(start_time + cc.get_response_budget())
+        self.turn += 1
+        try:
+            player_move = await asyncio.wait_for(asyncio.shield(self.pending_move), max(0.0, game_data.world.deadline - start_time))
+        except asyncio.TimeoutError:
+            print("The AI timed out with a maximum allowed response time of: {0} ms".format(
+                cc.MAXIMUM_ALLOWED_RESPONSE_TIME))
+            print("time ", (time.time() - start_time) * 1000)
+            print("turn ", self.turn)
+            self.ai_responded = False
+            if submitted:
+                player_move = get_assigned_moves(game_data)
+                print("Sending the {0} moves assigned before the deadline".format(len(player_move.uuid_to_core_map)))
+                return player_move
+            return Signals.NO_RESPONSE.name
+
+        self.pending_move = None
+        self.ai_responded = True
+        return player_move
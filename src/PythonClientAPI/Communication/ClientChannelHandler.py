@@ -3,15 +3,21 @@ import socket as s
 END_OF_MESSAGE_DELIMITER = '\n'
 MAX_BYTES_TO_RECEIVE = 1
 STRING_ENCODING = 'utf-8'
+HEADER_SIZE = 4
+# Initial size of the receive buffer, which grows to fit the largest message received
+RECEIVE_BUFFER_SIZE = 1 << 16
 
 
 class ClientChannelHandler():
     def __init__(self):
         self.connected = False
+        self._receive_buffer = bytearray(RECEIVE_BUFFER_SIZE)
 
     def start_socket_connection(self, port_number, host_name):
         try:
             self.sock = s.socket(s.AF_INET, s.SOCK_STREAM)
+            # messages are small and answered right away, so they should not wait to be coalesced
+            self.sock.setsockopt(s.IPPROTO_TCP, s.TCP_NODELAY, 1)
             self.sock.connect((host_name, port_number))
             self.connected = True
             print("Connected")
@@ -27,13 +33,12 @@ class ClientChannelHandler():
     def send_message(self, message):
         self.check_socket_connection()
         try:
-            # all messages are delimited by a "\n" character
+            # all messages are prefixed by their size, and sent along with it in a single call
             byte_encoded_message = message.encode(STRING_ENCODING)
             size = len(byte_encoded_message)
-            size_bytes = size.to_bytes(4, 'big')
+            size_bytes = size.to_bytes(HEADER_SIZE, 'big')
 
-            self.sock.sendall(size_bytes)
-            self.sock.sendall(byte_encoded_message)
+            self.sock.sendall(size_bytes + byte_encoded_message)
         except s.error:
             self.close_connection()
             raise Exception("Socket failed to send. Closing socket")
@@ -41,24 +46,35 @@ class ClientChannelHandler():
     def receive_message(self):
         self.check_socket_connection()
 
-        size_bytes = self.buffered_recv(4)
+        size_bytes = self.buffered_recv(HEADER_SIZE)
         size = int.from_bytes(size_bytes, byteorder='big')
 
         message_bytes = self.buffered_recv(size)
-        received_data = message_bytes.decode(STRING_ENCODING)
+        received_data = str(message_bytes, STRING_ENCODING)
 
         return received_data.strip()
 
     def buffered_recv(self, size):
-        bytes_read = 0
-        msg_chunks = []
+        """
+        Reads exactly size bytes into the receive buffer.
+
+        :param int size: number of bytes to read
+        :return: view of the bytes read, which is only valid until the next call
+        :rtype: memoryview
+        """
+        if size > len(self._receive_buffer):
+            self._receive_buffer = bytearray(max(size, len(self._receive_buffer) * 2))
+        view = memoryview(self._receive_buffer)[:size]
 
+        bytes_read = 0
         while bytes_read < size:
-            new_bytes = self.sock.recv(size - bytes_read)
-            bytes_read += len(new_bytes)
-            msg_chunks.append(new_bytes)
+            new_bytes = self.sock.recv_into(view[bytes_read:], size - bytes_read)
+            if new_bytes == 0:
+                self.close_connection()
+                raise Exception("Socket was closed by the server. Closing socket")
+            bytes_read += new_bytes
 
-        return b"".join(msg_chunks)
+        return view
 
     def check_socket_connection(self):
         if not self.connected:
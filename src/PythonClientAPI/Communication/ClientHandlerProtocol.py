@@ -1,7 +1,5 @@
-import cProfile
-import io
 import json
-import pstats
+import os
 import time
 
 import PythonClientAPI.Communication.CommunicatorConstants as cc
@@ -10,19 +8,45 @@ from PythonClientAPI.Communication.ClientChannelHandler import *
 import PythonClientAPI.Game.JSON as JSON
 from PythonClientAPI.Communication.AIHandlerThread import *
 from PythonClientAPI.Communication.Flag import Flag
+from PythonClientAPI.Communication.GameRecorder import GameRecorder
+from PythonClientAPI.Communication.TurnTimings import TurnTimings
 from PythonClientAPI.Game.Enums import Direction
+from PythonClientAPI.Game.InstrumentedPlayerAPI import InstrumentedPlayerAPI
+from PythonClientAPI.Game.NeighbourTable import get_neighbour_table
+from PythonClientAPI.Game.PlayerAPI import PlayerAPI
+from PythonClientAPI.Game.WorldModel import WorldModel
+from PythonClientAPI.Navigation.NavigationCache import navigation_cache
+from PythonClientAPI.Navigation.LazyNavigationCache import lazy_navigation_cache
+from PythonClientAPI.Navigation import NavigationCompiler
 
 
 class ClientHandlerProtocol():
-    def __init__(self, player_ai, port_number, max_response_time, uuidString):
+    def __init__(self, player_ai, port_number, max_response_time, uuidString, client_index=None):
+        """
+        :param int client_index: index of this client among those running in the same process, which is added to the
+            names of the files it records into; None if it is the only one
+        """
         self.player_ai = player_ai
         self.client_uuid = uuidString
+        self.client_index = client_index
         self.game_is_ongoing = False
         self.ai_responded = True
         cc.MAXIMUM_ALLOWED_RESPONSE_TIME = max_response_time
         cc.PORT_NUMBER = port_number
         self.turn = 0
         self.tiles = []
+        self.world_model = None
+        self.ai_worker = None
+        self.turn_timings = TurnTimings(self.get_client_file(Constants.TIMINGS_FILE)) if Constants.TIMINGS_FILE else None
+        self.api_class = PlayerAPI
+        self.api_statistics = None
+        self.api_statistics_file = None
+        if Constants.API_STATISTICS_FILE:
+            self.api_class = InstrumentedPlayerAPI
+            self.api_statistics = []
+            self.api_statistics_file = self.get_client_file(Constants.API_STATISTICS_FILE)
+        self.recorder = GameRecorder(self.get_client_file(Constants.RECORDING_FILE), uuidString, max_response_time) \
+            if Constants.RECORDING_FILE else None
 
     def start_connection(self):
         self.client_channel_handler = ClientChannelHandler()
@@ -48,6 +72,13 @@ class ClientHandlerProtocol():
     def end_communications(self):
         self.client_channel_handler.close_connection()
         self.game_is_ongoing = False
+        if self.ai_worker is not None:
+            self.ai_worker.stop()
+        if self.api_statistics:
+            self.write_api_statistics(self.api_statistics_file)
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
 
     def relay_message_and_respond_to(self, message_from_server):
         if message_from_server == Signals.BEGIN.name:
@@ -58,46 +89,128 @@ class ClientHandlerProtocol():
             self.end_communications()
         elif message_from_server == Signals.GET_READY.name:
             game_initial_state = self.client_channel_handler.receive_message()
-            self.tiles = JSON.parse_tile_data(game_initial_state)
-            Direction.ORDERED_DIRECTIONS = JSON.parse_ordered_directions(game_initial_state, self.client_uuid)
+            if self.recorder: self.recorder.record_initial_state(game_initial_state)
+            self.prepare_initial_state(JSON.parse_initial_state(game_initial_state, self.client_uuid))
+            self.get_ai_worker()
             self.client_channel_handler.send_message(Signals.READY.name)
         else:
             self.end_communications()
             raise Exception("Unrecognized signal received from server {0}".format(message_from_server))
 
+    def prepare_initial_state(self, initial_state):
+        # everything that only depends on the static map is computed before READY, so the first turn starts warm
+        self.tiles = initial_state.tiles
+        Direction.ORDERED_DIRECTIONS = initial_state.ordered_directions
+        self.prepare_navigation_data()
+        if not navigation_cache.loaded:
+            lazy_navigation_cache.bind(self.tiles)
+        get_neighbour_table(self.tiles)
+        self.world_model = WorldModel(self.tiles, self.api_class)
+
+    def prepare_navigation_data(self):
+        if navigation_cache.loaded or not Constants.NAVIGATION_CACHE_DIRECTORY:
+            return
+        try:
+            start_time = time.time()
+            file = NavigationCompiler.load_or_compile(self.tiles, Constants.NAVIGATION_CACHE_DIRECTORY,
+                                                      Constants.NAVIGATION_COMPILER_PROCESSES,
+                                                      Constants.NAVIGATION_COMPILE_CELL_LIMIT)
+            if file is None:
+                print("[NAV] Map is too large to compile before the game; path-finding will be computed as needed")
+            else:
+                print("[NAV] Navigation data ready in " + str(round((time.time() - start_time) * 1000)) + " ms")
+        except Exception:
+            print("Could not compile map navigation data. Path-finding may be very slow!", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+
     def start_game(self):
         self.client_channel_handler.send_message(self.client_uuid)
 
     def next_move_from_client(self):
+        turn = self.turn
+        if self.turn_timings: self.turn_timings.start_turn(turn)
 
+        phase_start = time.perf_counter()
         game_data_from_server = self.client_channel_handler.receive_message()
-        decoded_game_data = JSON.parse_game_state(game_data_from_server, self.tiles)
+        received_time = time.time()
+        phase_start = self.end_phase('receive', phase_start)
+
+        game_state = JSON.decode_json(game_data_from_server)
+        phase_start = self.end_phase('decode', phase_start)
+
+        decoded_game_data = JSON.as_any_game_state(game_state, self.tiles, self.world_model)
+        decoded_game_data.world.set_deadline(received_time + cc.get_response_budget())
+        phase_start = self.end_phase('build', phase_start)
 
-        client_move = self.get_timed_ai_response(decoded_game_data)
+        client_move = self.get_timed_ai_response(decoded_game_data, self.get_profile_file(turn))
+        phase_start = self.end_phase('do_move', phase_start)
 
         if isinstance(client_move, str):
             client_move_json = client_move
         else:
             client_move_json = json.dumps(client_move, cls=JSON.FFEncoder)
+        phase_start = self.end_phase('encode', phase_start)
 
         self.client_channel_handler.send_message(client_move_json)
-
-
-    def get_timed_ai_response(self, game_data):
-
-        if self.ai_responded:
-            self.player_move_event = threading.Event()
-            self.ai_handler_thread = AIHandlerThread(kwargs={'player_ai': self.player_ai,
-                                                             'decoded_game_data': game_data,
-                                                             'player_move_event': self.player_move_event})
-            self.ai_handler_thread.start()
+        self.end_phase('send', phase_start)
+
+        if self.recorder:
+            self.recorder.record_turn(turn, game_data_from_server, client_move_json, self.ai_responded)
+
+        if self.api_statistics is not None:
+            # kept by reference, so queries made by an AI that timed out are still counted towards its turn
+            self.api_statistics.append((turn, decoded_game_data.world.get_api_statistics()))
+
+        if self.turn_timings:
+            self.turn_timings.end_turn(responded=self.ai_responded,
+                                       moves=0 if isinstance(client_move, str) else len(client_move.uuid_to_core_map))
+
+    def end_phase(self, phase, phase_start):
+        phase_end = time.perf_counter()
+        if self.turn_timings: self.turn_timings.record(phase, phase_end - phase_start)
+        return phase_end
+
+    def write_api_statistics(self, file):
+        with open(file, 'w') as f:
+            for turn, statistics in self.api_statistics:
+                f.write(json.dumps({'turn': turn, 'methods': statistics}) + "\n")
+        self.api_statistics = []
+
+    def get_client_file(self, file):
+        """
+        :return: file with the client index added before its extensions, so that clients in one process do not write
+            over each other, e.g. game_1.jsonl.gz for client 1
+        """
+        if self.client_index is None: return file
+        directory, name = os.path.split(file)
+        stem, dot, extensions = name.partition('.')
+        return os.path.join(directory, "{0}_{1}{2}{3}".format(stem, self.client_index, dot, extensions))
+
+    def get_profile_file(self, turn):
+        if not Constants.PROFILE_DIRECTORY: return None
+        return os.path.join(Constants.PROFILE_DIRECTORY, "turn_{0}.prof".format(turn))
+
+    def get_ai_worker(self):
+        if self.ai_worker is None:
+            self.ai_worker = AIWorkerThread(self.player_ai)
+            self.ai_worker.start()
+        return self.ai_worker
+
+    def get_timed_ai_response(self, game_data, profile_file=None):
+        ai_worker = self.get_ai_worker()
+        # an AI that timed out is still working on an older state, which is waited on instead
+        submitted = self.ai_responded
+        if submitted:
+            ai_worker.submit(game_data, profile_file)
 
         start_time = time.time()
-        self.time_response(self.player_move_event, start_time + (cc.MAXIMUM_ALLOWED_RESPONSE_TIME / 1000))
+        if game_data.world.deadline is None:
+            game_data.world.set_deadline(start_time + cc.get_response_budget())
+        responded = ai_worker.wait_for_move(max(0.0, game_data.world.deadline - start_time))
         self.turn += 1
-        if self.player_move_event.is_set() and is_valid_response_time(start_time, time.time()):
+        if responded and is_valid_response_time(start_time, time.time()):
             self.ai_responded = True
-            return self.ai_handler_thread.get_move()
+            return ai_worker.get_move()
         else:
             print("The AI timed out with a maximum allowed response time of: {0} ms".format(
                 cc.MAXIMUM_ALLOWED_RESPONSE_TIME))
@@ -105,27 +218,13 @@ class ClientHandlerProtocol():
             print("turn ", self.turn)
             self.ai_responded = False
 
+            if submitted:
+                # rather than letting every unit rest, send what the AI has decided on so far
+                player_move = get_assigned_moves(game_data)
+                print("Sending the {0} moves assigned before the deadline".format(len(player_move.uuid_to_core_map)))
+                return player_move
             return Signals.NO_RESPONSE.name
 
-    def pprofile(self, pr):
-        pr.disable()
-        s = io.StringIO()
-        sortby = 'cumulative'
-        ps = pstats.Stats(pr, stream=s).sort_stats(sortby)
-        ps.print_stats()
-        print(s.getvalue(), file=sys.stderr, flush=True)
-        print("=x=" * 33, file=sys.stderr, flush=True)
-
-    def time_response(self, player_move_event, end_time):
-
-        # --------------------------
-        # while not player_move_event.is_set() and is_valid_response_time(start_time, time.time()):
-        #     time.sleep(0.01)
-        while not player_move_event.is_set() and time.time() < end_time:
-            player_move_event.wait(0.005)
-
-        # --------------------------e
-
 
 def is_valid_response_time(start_time, end_time):
     milliseconds_elapsed = (end_time - start_time) * 1000
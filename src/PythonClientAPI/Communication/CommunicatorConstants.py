@@ -2,3 +2,15 @@ PORT_NUMBER = 4461
 HOST_NAME = 'localhost'
 DEFAULT_HOST_NAME = 'localhost'
 MAXIMUM_ALLOWED_RESPONSE_TIME = 250
+# Milliseconds kept from the response time for encoding and sending the moves when do_move overruns
+RESPONSE_TIME_SAFETY_MARGIN = 50
+
+
+def get_response_budget(max_response_time=None):
+    """
+    :param int max_response_time: milliseconds allowed by the server, MAXIMUM_ALLOWED_RESPONSE_TIME by default
+    :return: seconds do_move may take before the moves assigned so far are sent in its place
+    :rtype: float
+    """
+    if max_response_time is None: max_response_time = MAXIMUM_ALLOWED_RESPONSE_TIME
+    return max(max_response_time - RESPONSE_TIME_SAFETY_MARGIN, max_response_time / 2) / 1000
@@ -0,0 +1,60 @@
+import gzip
+import json
+
+
+class GameRecorder:
+    """
+    Records the raw messages of a game as received from the server, together with the responses sent back,
+    to a gzip-compressed file holding one JSON object per line:
+    a header with the player uuid and maximum response time, the GET_READY message, then one line per MOVE.
+    """
+    def __init__(self, file, uuid, max_response_time):
+        self.file = gzip.open(file, 'wt', encoding='utf-8')
+        self.write({'uuid': uuid, 'maxResponseTime': max_response_time})
+
+    def record_initial_state(self, message):
+        self.write({'signal': 'GET_READY', 'message': message})
+
+    def record_turn(self, turn, message, response, responded):
+        """
+        :param str message: game state message received from the server
+        :param str response: message sent back in reply
+        :param bool responded: whether do_move finished before the response was sent
+        """
+        self.write({'signal': 'MOVE', 'turn': turn, 'message': message, 'response': response, 'responded': responded})
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class Recording:
+    """
+    Game read back from a file written by GameRecorder.
+
+    :ivar list turns: dicts with the 'turn', 'message', 'response' and 'responded' of every MOVE, in order
+    """
+    def __init__(self, uuid, max_response_time, initial_state_message, turns):
+        self.uuid = uuid
+        self.max_response_time = max_response_time
+        self.initial_state_message = initial_state_message
+        self.turns = turns
+
+
+def read_recording(file):
+    """
+    :rtype: Recording
+    """
+    with gzip.open(file, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        initial_state_message = None
+        turns = []
+        for line in f:
+            record = json.loads(line)
+            if record['signal'] == 'GET_READY':
+                initial_state_message = record['message']
+            else:
+                turns.append(record)
+    return Recording(header['uuid'], header['maxResponseTime'], initial_state_message, turns)
@@ -0,0 +1,30 @@
+import json
+
+# Phases of a turn, in order
+PHASES = ['receive', 'decode', 'build', 'do_move', 'encode', 'send']
+
+
+class TurnTimings:
+    """
+    Breakdown of where the time of every turn goes, appended to a file as one JSON object per line with the
+    milliseconds spent in each of PHASES, their total and any details given at the end of the turn.
+    """
+    def __init__(self, file):
+        self.file = file
+        self.turn = None
+        self.durations = {}
+
+    def start_turn(self, turn):
+        self.turn = turn
+        self.durations = {}
+
+    def record(self, phase, seconds):
+        self.durations[phase] = round(seconds * 1000, 3)
+
+    def end_turn(self, **details):
+        record = {'turn': self.turn}
+        record.update(self.durations)
+        record['total'] = round(sum(self.durations.values()), 3)
+        record.update(details)
+        with open(self.file, 'a') as f:
+            f.write(json.dumps(record) + '\n')
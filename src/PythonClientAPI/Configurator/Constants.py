@@ -3,3 +3,17 @@ import sys
 PLAYER_AI_PATH = sys.path[0]
 LOCAL_PLAYER_UUID = "UNKNOWN_PLAYER"
 MAP_NAME = ""
+# Directory in which navigation data compiled at GET_READY is kept; compilation is skipped if empty
+NAVIGATION_CACHE_DIRECTORY = ""
+NAVIGATION_COMPILER_PROCESSES = 1
+# Largest map, in cells, compiled at GET_READY; compiling takes time quadratic in the cell count and would hold up
+# READY, so larger maps without cached navigation data use the lazy navigation cache instead
+NAVIGATION_COMPILE_CELL_LIMIT = 1024
+# Directory into which cProfile stats of do_move are written every turn; profiling is off if empty
+PROFILE_DIRECTORY = ""
+# File to which the timing breakdown of every turn is appended as JSON lines; nothing is recorded if empty
+TIMINGS_FILE = ""
+# File to which the statistics of the World queries made every turn are written as JSON lines; nothing is recorded if empty
+API_STATISTICS_FILE = ""
+# File to which the messages of the game and the responses to them are recorded, gzip-compressed; nothing is recorded if empty
+RECORDING_FILE = ""
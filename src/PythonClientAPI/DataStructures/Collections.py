@@ -1,4 +1,5 @@
 import heapq
+from collections import deque
 
 class PriorityQueue:
     def __init__(self):
@@ -17,21 +18,23 @@ class PriorityQueue:
 
 class Queue:
     def __init__(self):
-        self.items = []
+        self.items = deque()
 
     def is_empty(self):
         return len(self.items) == 0
 
     def poll(self):
-        return self.items.pop(0)
+        return self.items.popleft()
 
     def add(self, item):
         self.items.append(item)
 
-def recursively_flatten_list(L, flattened = []):
+def recursively_flatten_list(L, flattened=None):
+    if flattened is None:
+        flattened = []
     if not isinstance(L, list):
         flattened.append(L)
     else:
         for item in L:
             recursively_flatten_list(item, flattened)
-        return flattened
+    return flattened
@@ -0,0 +1,57 @@
+from PythonClientAPI.DataStructures.Collections import Queue
+
+
+class DistanceField:
+    """
+    Result of a single breadth-first search started from many sources at once.
+    For every reachable point, holds the shortest path distance to the closest source and that source's target.
+
+    :ivar dict distances: maps reachable points to the distance to their closest source
+    :ivar dict nearest: maps reachable points to the target of their closest source
+    """
+    def __init__(self, open_neighbours, sources, walls=frozenset()):
+        """
+        :param dict open_neighbours: NeighbourTable.open_neighbours of the map
+        :param sources: points to search from, or a dict mapping them to their targets; walls and points off the map
+            are ignored
+        :param walls: points that are walls
+        """
+        if not isinstance(sources, dict):
+            sources = {source: source for source in sources}
+
+        self.distances = {}
+        self.nearest = {}
+
+        queue = Queue()
+        for source, target in sources.items():
+            if (source in open_neighbours) and not (source in walls) and not (source in self.distances):
+                self.distances[source] = 0
+                self.nearest[source] = target
+                queue.add(source)
+
+        distances = self.distances
+        nearest = self.nearest
+        while not queue.is_empty():
+            cursor = queue.poll()
+            distance = distances[cursor] + 1
+            target = nearest[cursor]
+            for neighbour in open_neighbours[cursor]:
+                if not (neighbour in distances):
+                    distances[neighbour] = distance
+                    nearest[neighbour] = target
+                    queue.add(neighbour)
+
+    def get_distance(self, point):
+        """
+        :param (int,int) point: point tuple
+        :return: shortest path distance from point to the closest source, or None if no source can be reached
+        :rtype: int
+        """
+        return self.distances.get(point)
+
+    def get_nearest(self, point):
+        """
+        :param (int,int) point: point tuple
+        :return: target of the closest source from point, or None if no source can be reached
+        """
+        return self.nearest.get(point)
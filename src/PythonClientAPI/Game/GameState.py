@@ -5,10 +5,25 @@ class GameState:
         self.player_index_to_uuid_map = player_index_to_uuid_map
         self.enemy_uuid = enemy_uuid
 
+class InitialState:
+    """
+    Static data sent by the server with GET_READY.
+
+    :ivar tiles: grid of TileType indexed as tiles[x][y]
+    :ivar list ordered_directions: Directions in the order the server uses for this player
+    """
+    def __init__(self, tiles, ordered_directions):
+        self.tiles = tiles
+        self.ordered_directions = ordered_directions
+
 class PlayerState:
-    def __init__(self, friendly_units, friendly_tile_positions, friendly_nest_positions):
+    """
+    :ivar list friendly_tile_entries: one [x, y, permanent] list per tile owned by the player, as sent by the server,
+        where permanent is 1 or 0; the Tiles themselves are built by the World when they are asked for
+    """
+    def __init__(self, friendly_units, friendly_tile_entries, friendly_nest_positions):
         self.friendly_units = friendly_units
-        self.friendly_tile_positions = friendly_tile_positions
+        self.friendly_tile_entries = friendly_tile_entries
         self.friendly_nest_positions = friendly_nest_positions
 
 class PlayerTurnActionInfo:
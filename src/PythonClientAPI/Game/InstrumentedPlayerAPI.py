@@ -0,0 +1,81 @@
+import bisect
+import time
+
+from PythonClientAPI.DataStructures.Collections import Queue, PriorityQueue
+from PythonClientAPI.Game.PlayerAPI import PlayerAPI
+
+# Upper bounds in milliseconds of the latency histogram buckets; the last bucket holds everything slower
+LATENCY_BUCKETS = [0.01, 0.1, 1, 10, 100]
+LATENCY_BUCKET_NAMES = ["<" + str(bound) for bound in LATENCY_BUCKETS] + [">=" + str(LATENCY_BUCKETS[-1])]
+
+
+class CountingQueue(Queue):
+    def __init__(self, api):
+        super().__init__()
+        self.api = api
+
+    def poll(self):
+        self.api.nodes_expanded += 1
+        return super().poll()
+
+
+class CountingPriorityQueue(PriorityQueue):
+    def __init__(self, api):
+        super().__init__()
+        self.api = api
+
+    def poll(self):
+        self.api.nodes_expanded += 1
+        return super().poll()
+
+
+class InstrumentedPlayerAPI(PlayerAPI):
+    """
+    PlayerAPI that records, for every public method called, the number of calls, the time spent, the number of nodes
+    expanded by its searches and a histogram of its latencies. Figures include nested calls, so a search called by
+    another method counts towards both. PlayerAPI itself is left untouched, so nothing is recorded or slowed down
+    unless this class is used.
+
+    :ivar dict statistics: maps method names to dicts of 'calls', 'time' (ms), 'nodes_expanded' and 'latencies'
+    """
+    def __init__(self, *args, **kwargs):
+        self.statistics = {}
+        self.nodes_expanded = 0
+        self.queue_class = lambda: CountingQueue(self)
+        self.priority_queue_class = lambda: CountingPriorityQueue(self)
+        super().__init__(*args, **kwargs)
+
+    def get_distance_field(self, sources):
+        distance_field = super().get_distance_field(sources)
+        self.nodes_expanded += len(distance_field.distances)
+        return distance_field
+
+    def record_call(self, name, elapsed, nodes_expanded):
+        method_statistics = self.statistics.get(name)
+        if method_statistics is None:
+            method_statistics = self.statistics[name] = {'calls': 0, 'time': 0.0, 'nodes_expanded': 0,
+                                                         'latencies': dict.fromkeys(LATENCY_BUCKET_NAMES, 0)}
+        milliseconds = elapsed * 1000
+        method_statistics['calls'] += 1
+        method_statistics['time'] += milliseconds
+        method_statistics['nodes_expanded'] += nodes_expanded
+        method_statistics['latencies'][LATENCY_BUCKET_NAMES[bisect.bisect_right(LATENCY_BUCKETS, milliseconds)]] += 1
+
+
+def instrument(name, method):
+    def instrumented_method(self, *args, **kwargs):
+        nodes_expanded = self.nodes_expanded
+        start_time = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.record_call(name, time.perf_counter() - start_time, self.nodes_expanded - nodes_expanded)
+
+    instrumented_method.__name__ = name
+    instrumented_method.__doc__ = method.__doc__
+    return instrumented_method
+
+# every public method of PlayerAPI is recorded, including the ones overridden above
+for name in dir(PlayerAPI):
+    if name.startswith('_') or name.endswith('_class') or not callable(getattr(PlayerAPI, name)): continue
+    setattr(InstrumentedPlayerAPI, name, instrument(name, getattr(InstrumentedPlayerAPI, name)))
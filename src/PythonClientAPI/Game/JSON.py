@@ -1,69 +1,100 @@
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
 import PythonClientAPI.Configurator.Constants as constants
 import PythonClientAPI.Communication.CommunicatorConstants as comm_constants
 from PythonClientAPI.Game.Entities import *
 from PythonClientAPI.Game.Enums import TileType, Team, MoveResult
 from PythonClientAPI.Game.GameState import *
-from PythonClientAPI.Game.World import World
+from PythonClientAPI.Game.WorldModel import WorldModel
 from enum import Enum
 
+def get_json_decoders():
+    """
+    :return: names of the JSON decoders that can be imported, fastest first, mapped to their loads function
+    :rtype: dict
+    """
+    decoders = {}
+    if orjson is not None: decoders['orjson'] = orjson.loads
+    if ujson is not None: decoders['ujson'] = ujson.loads
+    decoders['json'] = json.loads
+    return decoders
+
+def set_json_decoder(name=None):
+    """
+    Selects the decoder used for all messages from the server.
+
+    :param str name: one of the names returned by get_json_decoders, or None for the fastest one available
+    """
+    global decode_json
+    decoders = get_json_decoders()
+    if name is None:
+        name = next(iter(decoders))
+    if not (name in decoders):
+        raise ValueError("JSON decoder {0} is not available, expected one of {1}".format(name, list(decoders)))
+    decode_json = decoders[name]
+
+decode_json = json.loads
+set_json_decoder()
+
 def parse_config(jsn, player_index):
-    dct = json.loads(jsn)
+    dct = decode_json(jsn)
     constants.MAP_NAME = dct["mapName"]
     comm_constants.PORT_NUMBER = int(dct["portNumber"])
     comm_constants.MAXIMUM_ALLOWED_RESPONSE_TIME = int(dct["maxResponseTime"])
 
-def parse_game_state(jsn, tiles):
-    dct = json.loads(jsn)
-    return as_game_state(dct, tiles)
+def parse_game_state(jsn, tiles, world_model=None):
+    return as_any_game_state(decode_json(jsn), tiles, world_model)
 
-def parse_tile_data(game_starting_state):
-    dct = json.loads(game_starting_state)
-    return as_tiles(dct["tiles"])
+def as_any_game_state(dct, tiles, world_model=None):
+    if world_model is not None:
+        return as_incremental_game_state(dct, world_model)
+    return as_game_state(dct, tiles)
 
-def parse_ordered_directions(game_initial_state, uuid):
-    dct = json.loads(game_initial_state)["uuidToOrderedDirections"]
-    return as_direction_list(dct[uuid])
+def parse_initial_state(game_initial_state, uuid):
+    dct = decode_json(game_initial_state)
+    return InitialState(as_tiles(dct["tiles"]), as_direction_list(dct["uuidToOrderedDirections"][uuid]))
 
 def as_direction_list(directions):
     return [Direction[direction] for direction in directions]
 
 def as_game_state(dct, tiles):
-    player_uuid_to_player_type_map = {}
-    team_to_tiles_map = {}
+    return as_incremental_game_state(dct, WorldModel(tiles))
+
+def as_incremental_game_state(dct, world_model):
+    team_to_units_map = {}
+    team_to_tile_entries = {}
     team_to_nests_map = {}
+    uuid_to_team = {}
 
     for uuid in dct['playerUUIDToPlayerTypeMap'].keys():
+        player_dct = dct['playerUUIDToPlayerTypeMap'][uuid]
         if uuid == constants.LOCAL_PLAYER_UUID:
-            player_state = as_friendly_player_state(dct['playerUUIDToPlayerTypeMap'][uuid])
-            team_to_tiles_map[Team.FRIENDLY] = player_state.friendly_tile_positions
-            team_to_nests_map[Team.FRIENDLY] = player_state.friendly_nest_positions
+            team = Team.FRIENDLY
+            team_to_units_map[team] = as_friendly_unit_list(player_dct['friendlyUnits'])
         else:
-            player_state = as_enemy_player_state(dct['playerUUIDToPlayerTypeMap'][uuid])
-            team_to_tiles_map[Team.ENEMY] = player_state.friendly_tile_positions
-            team_to_nests_map[Team.ENEMY] = player_state.friendly_nest_positions
+            team = Team.ENEMY
+            team_to_units_map[team] = as_enemy_unit_list(player_dct['friendlyUnits'])
             enemy_uuid = uuid
+        team_to_tile_entries[team] = player_dct['friendlyTilePositions']
+        team_to_nests_map[team] = as_point_list(player_dct['friendlyNestPositions'])
+        uuid_to_team[uuid] = team
 
-        player_uuid_to_player_type_map[uuid] = player_state
+    world = world_model.update(team_to_units_map[Team.FRIENDLY], team_to_units_map[Team.ENEMY],
+                               team_to_tile_entries, team_to_nests_map)
 
+    player_uuid_to_player_type_map = {uuid: PlayerState(team_to_units_map[team], team_to_tile_entries[team], team_to_nests_map[team])
+                                      for uuid, team in uuid_to_team.items()}
     player_index_to_uuid_map = {player_index: dct['playerIndexToUUIDMap'][player_index] for player_index in dct['playerIndexToUUIDMap'].keys()}
 
-    world = World(tiles, player_uuid_to_player_type_map[constants.LOCAL_PLAYER_UUID].friendly_units,
-                  player_uuid_to_player_type_map[enemy_uuid].friendly_units,
-                  team_to_tiles_map, team_to_nests_map)
-
     return GameState(world, player_uuid_to_player_type_map, player_index_to_uuid_map, enemy_uuid)
 
-def as_friendly_player_state(dct):
-    return PlayerState(as_friendly_unit_list(dct['friendlyUnits']),
-                       as_friendly_tile_list(dct['friendlyTilePositions']),
-                       as_point_list(dct['friendlyNestPositions']))
-
-def as_enemy_player_state(dct):
-    return PlayerState(as_enemy_unit_list(dct['friendlyUnits']),
-                       as_enemy_tile_list(dct['friendlyTilePositions']),
-                       as_point_list(dct['friendlyNestPositions']))
-
 def as_enemy_unit_list(lst):
     return [as_enemy_unit(unit) for unit in lst]
 
@@ -76,14 +107,6 @@ def as_enemy_unit(dct):
 def as_friendly_unit(dct):
     return FriendlyUnit(dct['team'], dct['uuid'], int(dct['LF']), as_point_from_dct(dct['position']), MoveResult[dct['lastMoveResult']], dct['mergedUnitUuids'])
 
-def as_friendly_tile_list(lst):
-    return [Tile((tile[0], tile[1]), Team.FRIENDLY,
-                  True if tile[2] == 1 else False) for tile in lst]
-
-def as_enemy_tile_list(lst):
-    return [Tile((tile[0], tile[1]), Team.ENEMY,
-                 True if tile[2] == 1 else False) for tile in lst]
-
 def as_point_list(lst):
     return [as_point_from_array(point) for point in lst]
 
@@ -103,9 +126,12 @@ class FFEncoder(json.JSONEncoder):
         if isinstance(obj, PlayerTurnActionInfo):
             return {'uuidToCoreMap': {uuid: obj.uuid_to_core_map[uuid] for uuid in obj.uuid_to_core_map.keys()}}
         if isinstance(obj, FriendlyUnit):
-            return {'team': obj.team, 'uuid': obj.uuid, 'LF': obj.health, 'nextMoveType': obj._next_move_type.name, 'nextMoveTarget': tuple_to_point(obj._next_move_target), 'lastMoveResult': obj.last_move_result.name}
+            return as_move_dct(obj, obj._next_move_type, obj._next_move_target)
         return json.JSONEncoder.default(self, obj)
 
+def as_move_dct(unit, move_type, move_target):
+    return {'team': unit.team, 'uuid': unit.uuid, 'LF': unit.health, 'nextMoveType': move_type.name, 'nextMoveTarget': tuple_to_point(move_target), 'lastMoveResult': unit.last_move_result.name}
+
 def tuple_to_point(tupl):
     if tupl is None:
         return None
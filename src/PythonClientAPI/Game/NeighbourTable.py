@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+from PythonClientAPI.Game.Enums import TileType, Direction
+from PythonClientAPI.Navigation.NavigationCompiler import get_wall_data
+
+
+class NeighbourTable:
+    """
+    Neighbouring points of every point on a map, computed once per map and direction order.
+
+    :ivar dict neighbours: maps every point to a tuple of its neighbours, in the order of the directions
+    :ivar dict open_neighbours: maps every point to a tuple of its neighbours that are not walls, in the same order
+    :ivar frozenset walls: points that are walls
+    """
+    def __init__(self, tiles, directions):
+        self.width = len(tiles)
+        self.height = len(tiles[0])
+        self.directions = tuple(directions)
+
+        self.neighbours = {}
+        self.open_neighbours = {}
+
+        offsets = [direction.value for direction in self.directions]
+        for x in range(self.width):
+            for y in range(self.height):
+                neighbours = tuple(((x + dx) % self.width, (y + dy) % self.height) for dx, dy in offsets)
+                self.neighbours[(x, y)] = neighbours
+                self.open_neighbours[(x, y)] = tuple(n for n in neighbours if tiles[n[0]][n[1]] != TileType.WALL)
+        self.walls = frozenset((x, y) for x in range(self.width) for y in range(self.height)
+                               if tiles[x][y] == TileType.WALL)
+
+# Number of distinct wall layouts, and of tiles objects, remembered by get_neighbour_table
+MAX_CACHED_TABLES = 8
+
+_layouts = {}
+_tables = OrderedDict()
+_lock = threading.Lock()
+
+def get_neighbour_table(tiles):
+    """
+    Returns the NeighbourTable for tiles in the order of Direction.ORDERED_DIRECTIONS.
+    Tables are kept per wall layout, so clients playing on separate copies of the same map share a single table, and
+    the layout of each tiles object is only read the first time it is passed in.
+
+    :param tiles: grid of TileType indexed as tiles[x][y]
+    :rtype: NeighbourTable
+    """
+    entry = _layouts.get(id(tiles))
+    if (entry is None) or (entry[0] is not tiles):
+        layout = (len(tiles), get_wall_data(tiles))
+        with _lock:
+            if len(_layouts) >= MAX_CACHED_TABLES: _layouts.clear()
+            _layouts[id(tiles)] = (tiles, layout)
+    else:
+        layout = entry[1]
+
+    key = (layout, tuple(Direction.ORDERED_DIRECTIONS))
+    with _lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+    table = NeighbourTable(tiles, Direction.ORDERED_DIRECTIONS)
+    with _lock:
+        _tables[key] = table
+        if len(_tables) > MAX_CACHED_TABLES: _tables.popitem(last=False)
+    return table
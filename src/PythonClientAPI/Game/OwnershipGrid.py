@@ -0,0 +1,180 @@
+from PythonClientAPI.Game.Entities import Tile
+from PythonClientAPI.Game.Enums import TileType, Team
+
+# Codes stored in OwnershipGrid.owners
+NEUTRAL = 0
+FRIENDLY = 1
+ENEMY = 2
+WALL = 3
+
+CODE_TO_TEAM = {NEUTRAL: Team.NEUTRAL, FRIENDLY: Team.FRIENDLY, ENEMY: Team.ENEMY, WALL: None}
+TEAM_TO_CODE = {Team.NEUTRAL: NEUTRAL, Team.FRIENDLY: FRIENDLY, Team.ENEMY: ENEMY}
+
+
+class OwnershipGrid:
+    """
+    Owner and permanence of every cell on the map, stored as one byte each and indexed by x * height + y.
+    Tile objects are only created when a cell is asked for, and are kept until the cell changes.
+
+    :ivar bytearray owners: NEUTRAL, FRIENDLY, ENEMY or WALL code of every cell
+    :ivar bytearray permanent: 1 for every cell that is permanently owned, 0 otherwise
+    :ivar list tiles: Tile of every cell, or None if it is a wall or has not been created yet
+    :ivar dict team_indices: maps FRIENDLY and ENEMY to the indices of their cells, in the order they were given
+    """
+    def __init__(self, tiles, team_to_tiles_map):
+        self.width = len(tiles)
+        self.height = len(tiles[0])
+
+        cell_count = self.width * self.height
+        self.owners = bytearray(WALL if tile == TileType.WALL else NEUTRAL for column in tiles for tile in column)
+        self.permanent = bytearray(cell_count)
+        self.tiles = [None] * cell_count
+        self.team_indices = {FRIENDLY: [], ENEMY: []}
+        self._position_to_tile = None
+        self._neutral_tiles = None
+
+        height = self.height
+        for team_tiles in team_to_tiles_map.values():
+            for tile in team_tiles:
+                index = tile.position[0] * height + tile.position[1]
+                owner = FRIENDLY if tile.is_friendly() else ENEMY if tile.is_enemy() else NEUTRAL
+                self.owners[index] = owner
+                self.permanent[index] = 1 if tile.is_permanently_owned() else 0
+                self.tiles[index] = tile
+                if owner != NEUTRAL:
+                    self.team_indices[owner].append(index)
+
+    def update(self, team_to_tile_entries):
+        """
+        Applies the tiles owned by each team as sent by the server. Only cells whose owner or permanence changed
+        lose their Tile, and cells that are no longer owned by a team become neutral.
+
+        :param dict team_to_tile_entries: maps Team.FRIENDLY and Team.ENEMY to lists of [x, y, permanent] entries
+        """
+        owners = self.owners
+        permanent = self.permanent
+        height = self.height
+
+        team_indices = {}
+        for team, entries in team_to_tile_entries.items():
+            owner = TEAM_TO_CODE[team]
+            indices = []
+            # entries are applied as decoded, without creating anything per tile but its index
+            for x, y, is_permanent in entries:
+                index = x * height + y
+                indices.append(index)
+                if (owners[index] != owner) or (permanent[index] != (is_permanent == 1)):
+                    self._set_owner(index, owner, 1 if is_permanent == 1 else 0)
+            team_indices[owner] = indices
+
+        owned_indices = set(team_indices.get(FRIENDLY, ())).union(team_indices.get(ENEMY, ()))
+        for owner, indices in self.team_indices.items():
+            for index in indices:
+                if not (index in owned_indices):
+                    self._set_owner(index, NEUTRAL, 0)
+
+        team_indices.setdefault(FRIENDLY, [])
+        team_indices.setdefault(ENEMY, [])
+        self.team_indices = team_indices
+
+    def copy(self):
+        """
+        :return: grid with the same cells, which can be updated without affecting this one. Tiles are immutable,
+            so they are shared, as is the list of neutral tiles, which is replaced rather than modified.
+        :rtype: OwnershipGrid
+        """
+        grid = OwnershipGrid.__new__(OwnershipGrid)
+        grid.width = self.width
+        grid.height = self.height
+        grid.owners = bytearray(self.owners)
+        grid.permanent = bytearray(self.permanent)
+        grid.tiles = list(self.tiles)
+        grid.team_indices = dict(self.team_indices)
+        grid._position_to_tile = dict(self._position_to_tile) if self._position_to_tile is not None else None
+        grid._neutral_tiles = self._neutral_tiles
+        return grid
+
+    def _set_owner(self, index, owner, is_permanent):
+        if (self.owners[index] == NEUTRAL) != (owner == NEUTRAL):
+            self._neutral_tiles = None
+        self.owners[index] = owner
+        self.permanent[index] = is_permanent
+        self.tiles[index] = None
+        if self._position_to_tile is not None:
+            tile = self._get_tile_at_index(index)
+            self._position_to_tile[tile.position] = tile
+
+    def _get_tile_at_index(self, index):
+        tile = self.tiles[index]
+        if tile is None:
+            owner = self.owners[index]
+            if owner == WALL: return None
+            tile = Tile((index // self.height, index % self.height), CODE_TO_TEAM[owner], self.permanent[index] == 1)
+            self.tiles[index] = tile
+        return tile
+
+    def get_index(self, point):
+        return point[0] * self.height + point[1]
+
+    def is_within_bounds(self, point):
+        return (0 <= point[0] < self.width) and (0 <= point[1] < self.height)
+
+    def get_owner(self, point):
+        """
+        :param (int,int) point: point within bounds
+        :return: NEUTRAL, FRIENDLY, ENEMY or WALL code of point
+        :rtype: int
+        """
+        return self.owners[point[0] * self.height + point[1]]
+
+    def get_team(self, point):
+        """
+        :param (int,int) point: point within bounds
+        :return: Team owning point, or None if point is a wall
+        :rtype: Team
+        """
+        return CODE_TO_TEAM[self.owners[point[0] * self.height + point[1]]]
+
+    def is_permanently_owned(self, point):
+        """
+        :param (int,int) point: point within bounds
+        :rtype: bool
+        """
+        return self.permanent[point[0] * self.height + point[1]] == 1
+
+    def get_tile(self, point):
+        """
+        :param (int,int) point: point tuple
+        :return: Tile at point, or None if point is a wall or out of bounds
+        :rtype: Tile
+        """
+        if not self.is_within_bounds(point): return None
+        return self._get_tile_at_index(point[0] * self.height + point[1])
+
+    def get_team_tiles(self, owner):
+        """
+        :param int owner: NEUTRAL, FRIENDLY or ENEMY code
+        :return: new list of the Tiles of all cells with that owner; neutral tiles are in cell order,
+            team tiles in the order they were given
+        :rtype: list of Tile
+        """
+        if owner != NEUTRAL:
+            return [self._get_tile_at_index(index) for index in self.team_indices[owner]]
+        if self._neutral_tiles is None:
+            self._neutral_tiles = [self._get_tile_at_index(index) for index, cell_owner in enumerate(self.owners)
+                                   if cell_owner == NEUTRAL]
+        # the cached list outlives this call, so callers get a copy they are free to modify
+        return list(self._neutral_tiles)
+
+    def get_position_to_tile_dict(self):
+        """
+        :return: dictionary whose keys are (x,y) tuples and values are the Tiles at those positions
+        :rtype: dict
+        """
+        if self._position_to_tile is None:
+            self._position_to_tile = {}
+            for index, owner in enumerate(self.owners):
+                if owner != WALL:
+                    tile = self._get_tile_at_index(index)
+                    self._position_to_tile[tile.position] = tile
+        return self._position_to_tile
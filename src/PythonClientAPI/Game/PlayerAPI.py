@@ -1,12 +1,19 @@
 from PythonClientAPI.Game.Enums import TileType, Direction, Team
 from PythonClientAPI.Game.PointUtils import mod_point, mod_taxi_cab_distance
+from PythonClientAPI.Game.NeighbourTable import get_neighbour_table
+from PythonClientAPI.Game.DistanceField import DistanceField
+from PythonClientAPI.Game import OwnershipGrid
 from PythonClientAPI.DataStructures.Collections import Queue, PriorityQueue, recursively_flatten_list
 from PythonClientAPI.Navigation.NavigationCache import navigation_cache
+from PythonClientAPI.Navigation.LazyNavigationCache import lazy_navigation_cache
 
 
 class PlayerAPI:
+    # searches create their queues through these, so that InstrumentedPlayerAPI can count the nodes they expand
+    queue_class = Queue
+    priority_queue_class = PriorityQueue
 
-    def __init__(self, tiles, friendlies, enemies, team_to_tiles_map, team_to_nests_map):
+    def __init__(self, tiles, friendlies, enemies, team_to_tiles_map, team_to_nests_map, ownership_grid=None, previous_api=None):
         self.tiles = tiles
         self.width = len(tiles)
         self.height = len(tiles[0])
@@ -14,10 +21,20 @@ class PlayerAPI:
         self.enemies = enemies
         self.team_to_tiles_map = team_to_tiles_map
         self.team_to_nests_map = team_to_nests_map
+        self.ownership_grid = ownership_grid or OwnershipGrid.OwnershipGrid(tiles, team_to_tiles_map)
+
+        self.neighbour_table = get_neighbour_table(tiles)
 
         self._position_to_tile_cache = None
         self._position_to_unit_cache = None
         self._nest_clusters_cache = None
+        self._distance_fields_cache = {}
+        self._tiles_cache = None
+        self._nest_positions_cache = None
+
+        # nest clusters only depend on nest positions and the static map, so they carry over while nests do not change
+        if previous_api and previous_api._nest_clusters_cache and (previous_api.team_to_nests_map == team_to_nests_map):
+            self._nest_clusters_cache = previous_api._nest_clusters_cache
 
     def get_width(self):
         return self.width
@@ -39,17 +56,26 @@ class PlayerAPI:
                (point[0] == 0 or point[1] == 0 or point[0] == self.width - 1 or point[1] == self.height - 1)
 
     def get_neighbours(self, point):
-        neighbours = {}
-        for direction in Direction.ORDERED_DIRECTIONS:
-            neighbours[direction] = mod_point(direction.move_point(point), (self.width, self.height))
+        return dict(zip(self.neighbour_table.directions, self._get_neighbour_points(point)))
+
+    def _get_neighbour_points(self, point):
+        # neighbours in the order of the table's directions, without allocating a dict
+        neighbours = self.neighbour_table.neighbours.get(point)
+        if neighbours is None:
+            neighbours = tuple(mod_point(direction.move_point(point), (self.width, self.height))
+                               for direction in self.neighbour_table.directions)
         return neighbours
 
     # A* path-finding
     def get_shortest_path(self, start, end, avoid):
+        if start == end: return [end]
+        # the neighbour table only holds points within bounds, so wrapped points are brought back onto the map
+        start = mod_point(start, (self.width, self.height))
+        end = mod_point(end, (self.width, self.height))
         if start == end: return [end]
         if self.is_wall(start) or self.is_wall(end): return None
 
-        queue = PriorityQueue()
+        queue = self.priority_queue_class()
 
         queue.add(start, 0)
 
@@ -59,13 +85,13 @@ class PlayerAPI:
         inverted_tree[start] = None
         movement_costs[start] = 0
 
+        open_neighbours = self.neighbour_table.open_neighbours
+
         while not queue.is_empty():
             current = queue.poll()
 
-            neighbours = self.get_neighbours(current)
-            for direction in Direction.ORDERED_DIRECTIONS:
-                neighbour = neighbours[direction]
-                if self.is_wall(neighbour) or (avoid and (neighbour in avoid)):
+            for neighbour in open_neighbours[current]:
+                if avoid and (neighbour in avoid):
                     continue
                 cost = movement_costs[current] + 1
                 if (neighbour not in movement_costs) or (cost < movement_costs[neighbour]):
@@ -88,19 +114,33 @@ class PlayerAPI:
         return None
 
     def get_next_point_in_shortest_path(self, start, end):
-        if not navigation_cache.loaded:
-            path = self.get_shortest_path(start, end, None)
-            if path: return path.get(0)
-            return start
-        direction = navigation_cache.get_next_direction_in_path(start, end)
+        direction = self._get_navigation_cache().get_next_direction_in_path(start, end)
         return mod_point(direction.move_point(start), (self.get_width(), self.get_height()))
 
     def get_shortest_path_distance(self, start, end):
+        return self._get_navigation_cache().get_distance(start, end)
+
+    def _get_navigation_cache(self):
+        if navigation_cache.loaded: return navigation_cache
+        lazy_navigation_cache.bind(self.tiles)
+        return lazy_navigation_cache
+
+    def get_next_points_in_shortest_paths(self, pairs):
+        if not navigation_cache.loaded:
+            return [self.get_next_point_in_shortest_path(start, end) for start, end in pairs]
+        if not pairs: return []
+        starts, ends = zip(*pairs)
+        index_to_direction = Direction.INDEX_TO_DIRECTION
+        next_points = []
+        for start, index in zip(starts, navigation_cache.get_next_direction_indices(starts, ends)):
+            delta = index_to_direction[index].value
+            next_points.append(((start[0] + delta[0]) % self.width, (start[1] + delta[1]) % self.height))
+        return next_points
+
+    def get_shortest_path_distances(self, starts, ends):
         if not navigation_cache.loaded:
-            path = self.get_shortest_path(start, end, None)
-            if path: return len(path)
-            return 0
-        return navigation_cache.get_distance(start, end)
+            return [[self.get_shortest_path_distance(start, end) for end in ends] for start in starts]
+        return navigation_cache.get_distances(starts, ends)
 
     def get_closest_enemy_from(self, point, excluding_units):
         if not self._position_to_unit_cache: self._create_position_to_unit_cache()
@@ -120,27 +160,29 @@ class PlayerAPI:
             self._position_to_unit_cache[unit.position] = unit
 
     def get_closest_neutral_tile_from(self, point, excluding_points):
-        if not self._position_to_tile_cache: self._create_position_to_tile_cache()
-        target = self.get_closest_point_from(point, lambda p: (p in self._position_to_tile_cache) and (self._position_to_tile_cache[p].is_neutral()) and ((not excluding_points) or (p not in excluding_points)))
-        if target: return self._position_to_tile_cache[target]
-        return None
+        return self._get_closest_tile_from(point, excluding_points, lambda owner, permanent: owner == OwnershipGrid.NEUTRAL)
 
     def get_closest_enemy_tile_from(self, point, excluding_points):
-        if not self._position_to_tile_cache: self._create_position_to_tile_cache()
-        target = self.get_closest_point_from(point, lambda p: (p in self._position_to_tile_cache) and (self._position_to_tile_cache[p].is_enemy()) and ((not excluding_points) or (p not in excluding_points)))
-        if target: return self._position_to_tile_cache[target]
-        return None
+        return self._get_closest_tile_from(point, excluding_points, lambda owner, permanent: owner == OwnershipGrid.ENEMY)
 
     def get_closest_capturable_tile_from(self, point, excluding_points):
-        if not self._position_to_tile_cache: self._create_position_to_tile_cache()
-        target = self.get_closest_point_from(point, lambda p: (p in self._position_to_tile_cache) and (not self._position_to_tile_cache[p].is_friendly()) and (not self._position_to_tile_cache[p].is_permanently_owned()) and ((not excluding_points) or (p not in excluding_points)))
-        if target: return self._position_to_tile_cache[target]
-        return None
+        return self._get_closest_tile_from(point, excluding_points, lambda owner, permanent: (owner != OwnershipGrid.FRIENDLY) and (not permanent))
 
     def get_closest_friendly_tile_from(self, point, excluding_points):
-        if not self._position_to_tile_cache: self._create_position_to_tile_cache()
-        target = self.get_closest_point_from(point, lambda p: (p in self._position_to_tile_cache) and (self._position_to_tile_cache[p].is_friendly()) and ((not excluding_points) or (p not in excluding_points)))
-        if target: return self._position_to_tile_cache[target]
+        return self._get_closest_tile_from(point, excluding_points, lambda owner, permanent: owner == OwnershipGrid.FRIENDLY)
+
+    def _get_closest_tile_from(self, point, excluding_points, condition):
+        owners = self.ownership_grid.owners
+        permanent = self.ownership_grid.permanent
+        height = self.ownership_grid.height
+
+        def is_target(p):
+            index = p[0] * height + p[1]
+            owner = owners[index]
+            return (owner != OwnershipGrid.WALL) and condition(owner, permanent[index]) and ((not excluding_points) or (p not in excluding_points))
+
+        target = self.get_closest_point_from(point, is_target)
+        if target: return self.ownership_grid.get_tile(target)
         return None
 
     def get_closest_friendly_nest_from(self, point, excluding_points):
@@ -152,18 +194,19 @@ class PlayerAPI:
         return self.get_closest_point_from(point, lambda p: (p in enemy_nests) and ((not excluding_points) or (p not in excluding_points)))
 
     def get_closest_point_from(self, source, condition):
-        queue = Queue()
+        source = mod_point(source, (self.width, self.height))
+        queue = self.queue_class()
         visited = set()
         queue.add(source)
         visited.add(source)
 
+        open_neighbours = self.neighbour_table.open_neighbours
+
         while not (queue.is_empty()):
             cursor = queue.poll()
-            neighbours = self.get_neighbours(cursor)
 
-            for direction in Direction.ORDERED_DIRECTIONS:
-                neighbour = neighbours[direction]
-                if not ((neighbour in visited) or self.is_wall(neighbour)):
+            for neighbour in open_neighbours[cursor]:
+                if not (neighbour in visited):
                     queue.add(neighbour)
                     visited.add(neighbour)
 
@@ -171,9 +214,43 @@ class PlayerAPI:
 
         return None
 
+    def get_distance_field(self, sources):
+        return DistanceField(self.neighbour_table.open_neighbours, sources, self.neighbour_table.walls)
+
+    def get_enemy_distance_field(self):
+        return self._get_cached_distance_field('enemy', lambda: {unit.position: unit for unit in self.enemies})
+
+    def get_friendly_distance_field(self):
+        return self._get_cached_distance_field('friendly', lambda: {unit.position: unit for unit in self.friendlies})
+
+    def get_enemy_nest_distance_field(self):
+        return self._get_cached_distance_field('enemy_nest', lambda: self.team_to_nests_map[Team.ENEMY])
+
+    def get_friendly_nest_distance_field(self):
+        return self._get_cached_distance_field('friendly_nest', lambda: self.team_to_nests_map[Team.FRIENDLY])
+
+    def get_capturable_tile_distance_field(self):
+        return self._get_cached_distance_field('capturable_tile', self._get_capturable_tiles)
+
+    def _get_capturable_tiles(self):
+        grid = self.ownership_grid
+        capturable = {}
+        for index, owner in enumerate(grid.owners):
+            if (owner == OwnershipGrid.NEUTRAL or owner == OwnershipGrid.ENEMY) and (not grid.permanent[index]):
+                position = (index // grid.height, index % grid.height)
+                capturable[position] = grid.get_tile(position)
+        return capturable
+
+    def _get_cached_distance_field(self, key, get_sources):
+        if not (key in self._distance_fields_cache):
+            self._distance_fields_cache[key] = self.get_distance_field(get_sources())
+        return self._distance_fields_cache[key]
+
     def get_nest_positions(self):
-        nests = [team_nests for team_nests in self.team_to_nests_map.values()]
-        return recursively_flatten_list(nests)
+        if self._nest_positions_cache is None:
+            nests = [team_nests for team_nests in self.team_to_nests_map.values()]
+            self._nest_positions_cache = recursively_flatten_list(nests)
+        return self._nest_positions_cache
 
     def get_friendly_nest_positions(self):
         return self.team_to_nests_map[Team.FRIENDLY]
@@ -192,7 +269,8 @@ class PlayerAPI:
     def _create_nest_clusters_cache(self):
         environ_to_nests = self._get_extension_to_nests_map()
 
-        self._nest_clusters_cache = {Team.FRIENDLY: [], Team.ENEMY: []}
+        # built aside and only published once complete, since the next turn's PlayerAPI may pick it up at any time
+        nest_clusters = {Team.FRIENDLY: [], Team.ENEMY: []}
 
         visited = set()
 
@@ -200,7 +278,7 @@ class PlayerAPI:
             team_nests = self.team_to_nests_map[team]
             for nest in team_nests:
                 if not (nest in visited):
-                    queue = Queue()
+                    queue = self.queue_class()
                     cluster = set()
 
                     queue.add(nest)
@@ -210,15 +288,18 @@ class PlayerAPI:
                     while not queue.is_empty():
                         current = queue.poll()
 
-                        for environ in self.get_tiles_around(current).values():
-                            for connected_nest in environ_to_nests[environ.position]:
+                        for environ in self._get_neighbour_points(current):
+                            if self.is_wall(environ): continue
+                            for connected_nest in environ_to_nests[environ]:
                                 self._check_and_visit(connected_nest, queue, cluster, visited, team_nests)
-                            for ext_environ in self.get_tiles_around(environ.position).values():
-                                if ext_environ.position in environ_to_nests:
-                                    for touching_nest in environ_to_nests[ext_environ.position]:
+                            for ext_environ in self._get_neighbour_points(environ):
+                                if (ext_environ in environ_to_nests) and (not self.is_wall(ext_environ)):
+                                    for touching_nest in environ_to_nests[ext_environ]:
                                         self._check_and_visit(touching_nest, queue, cluster, visited, team_nests)
 
-                    self._nest_clusters_cache[team].append(cluster)
+                    nest_clusters[team].append(cluster)
+
+        self._nest_clusters_cache = nest_clusters
 
     def _check_and_visit(self, nest, queue, cluster, visited, team_nests):
         if (not (nest in cluster)) and (nest in team_nests):
@@ -230,10 +311,11 @@ class PlayerAPI:
         environ_to_nests = {}
         for team in self.team_to_nests_map.keys():
             for nest in self.team_to_nests_map[team]:
-                for environ in self.get_tiles_around(nest).values():
-                    if not (environ.position in environ_to_nests):
-                        environ_to_nests[environ.position] = []
-                    environ_to_nests[environ.position].append(nest)
+                for environ in self._get_neighbour_points(nest):
+                    if self.is_wall(environ): continue
+                    if not (environ in environ_to_nests):
+                        environ_to_nests[environ] = []
+                    environ_to_nests[environ].append(nest)
 
         return environ_to_nests
 
@@ -251,12 +333,10 @@ class PlayerAPI:
 
     def get_tiles_around(self, point):
         tile_neighbours = {}
-        if not self._position_to_tile_cache:
-            self._create_position_to_tile_cache()
-        neighbours = self.get_neighbours(point)
-        for direction in neighbours:
-            if neighbours[direction] in self._position_to_tile_cache:
-                tile_neighbours[direction] = self._position_to_tile_cache[neighbours[direction]]
+        for direction, neighbour in zip(self.neighbour_table.directions, self._get_neighbour_points(point)):
+            tile = self.ownership_grid.get_tile(neighbour)
+            if tile is not None:
+                tile_neighbours[direction] = tile
         return tile_neighbours
 
     def get_enemy_tiles_around(self, point):
@@ -267,35 +347,39 @@ class PlayerAPI:
 
     def _get_team_tiles_around(self, point, team):
         belongs_to_team = []
-        for tile in self.get_tiles_around(point).values():
-            is_team = tile.is_friendly() if team == Team.FRIENDLY else tile.is_enemy()
-            if is_team: belongs_to_team.append(tile)
+        team_owner = OwnershipGrid.TEAM_TO_CODE[team]
+        grid = self.ownership_grid
+        for neighbour in self._get_neighbour_points(point):
+            if grid.is_within_bounds(neighbour) and grid.get_owner(neighbour) == team_owner:
+                belongs_to_team.append(grid.get_tile(neighbour))
         return belongs_to_team
 
     def get_neutral_tiles(self):
-        return self.team_to_tiles_map[Team.NEUTRAL]
+        return self._get_team_tiles(Team.NEUTRAL)
 
     def get_friendly_tiles(self):
-        return self.team_to_tiles_map[Team.FRIENDLY]
+        return self._get_team_tiles(Team.FRIENDLY)
 
     def get_enemy_tiles(self):
-        return self.team_to_tiles_map[Team.ENEMY]
+        return self._get_team_tiles(Team.ENEMY)
+
+    def _get_team_tiles(self, team):
+        if not (team in self.team_to_tiles_map):
+            self.team_to_tiles_map[team] = self.ownership_grid.get_team_tiles(OwnershipGrid.TEAM_TO_CODE[team])
+        return self.team_to_tiles_map[team]
 
     def get_tiles(self):
-        tiles = [t for t in self.team_to_tiles_map.values()]
-        return recursively_flatten_list(tiles)
+        if self._tiles_cache is None:
+            tiles = [self._get_team_tiles(team) for team in (Team.FRIENDLY, Team.ENEMY, Team.NEUTRAL)]
+            self._tiles_cache = recursively_flatten_list(tiles)
+        return self._tiles_cache
 
     def get_tile_at(self, point):
-        if not self._position_to_tile_cache: self._create_position_to_tile_cache()
-        if point in self._position_to_tile_cache: return self._position_to_tile_cache[point]
-        return None
+        return self.ownership_grid.get_tile(point)
 
     def get_position_to_tile_dict(self):
         if not self._position_to_tile_cache: self._create_position_to_tile_cache()
         return self._position_to_tile_cache
 
     def _create_position_to_tile_cache(self):
-        self._position_to_tile_cache = {}
-        for tiles in self.team_to_tiles_map.values():
-            for tile in tiles:
-                self._position_to_tile_cache[tile.position] = tile
\ No newline at end of file
+        self._position_to_tile_cache = self.ownership_grid.get_position_to_tile_dict()
\ No newline at end of file
@@ -1,12 +1,23 @@
+import time
+
 from PythonClientAPI.Game.PlayerAPI import PlayerAPI
-from PythonClientAPI.Game.Enums import TileType, Team, MoveType
-from PythonClientAPI.Game.Entities import Tile
+from PythonClientAPI.Game.Enums import MoveType
+from PythonClientAPI.Game.OwnershipGrid import OwnershipGrid
 
 class World:
-    def __init__(self, tiles, friendlies, enemies, team_to_tiles_map, team_to_nests_map):
-        self._deduce_neutral_tiles(tiles, team_to_tiles_map)
+    # API used unless another one, such as InstrumentedPlayerAPI to record statistics about the queries made each turn,
+    # is passed to the constructor
+    api_class = PlayerAPI
+
+    def __init__(self, tiles, friendlies, enemies, team_to_tiles_map, team_to_nests_map, ownership_grid=None, previous_world=None,
+                 api_class=None):
+        # tiles missing from team_to_tiles_map, such as the neutral ones, are created from the grid when asked for
+        self.ownership_grid = ownership_grid or OwnershipGrid(tiles, team_to_tiles_map)
         self._create_uuid_to_friendlies_map(friendlies)
-        self.api = PlayerAPI(tiles, friendlies, enemies, team_to_tiles_map, team_to_nests_map)
+        # time.time() by which the moves assigned so far are sent, or None if the turn is not timed
+        self.deadline = None
+        self.api = (api_class or self.api_class)(tiles, friendlies, enemies, team_to_tiles_map, team_to_nests_map, self.ownership_grid,
+                                  previous_world.api if previous_world else None)
 
     def get_unit(self, uuid):
         """
@@ -49,29 +60,33 @@ class World:
 
         return unit._next_move_type
 
-    def _create_uuid_to_friendlies_map(self, friendlies):
-        self.uuid_to_friendlies_map = {}
-        for unit in friendlies:
-            self.uuid_to_friendlies_map[unit.uuid] = unit
+    def get_remaining_time(self):
+        """
+        Returns how long do_move has left this turn. Once this runs out, the moves assigned so far
+        are sent and units without a move rest, so expensive strategies can be cut short before then.
 
-    def _deduce_neutral_tiles(self, tiles, team_to_tiles_map):
-        friendly_tiles = []
-        enemy_tiles = []
+        :return: remaining time in milliseconds, or infinity if the turn is not timed
+        :rtype: float
+        """
+        if self.deadline is None: return float('inf')
+        return max(0.0, (self.deadline - time.time()) * 1000)
+
+    def set_deadline(self, deadline):
+        self.deadline = deadline
 
-        for tile_list in team_to_tiles_map.values():
-            for tile in tile_list:
-                if tile.is_friendly(): friendly_tiles.append(tile.position)
-                elif tile.is_enemy(): enemy_tiles.append(tile.position)
+    def get_api_statistics(self):
+        """
+        Returns the calls, time (ms), nodes expanded and latency histogram of every query made on this World so far,
+        keyed by method name, or None if statistics are not being recorded.
 
-        width = len(tiles)
-        height = len(tiles[0])
-        neutral_tiles = []
-        for x in range(0, width):
-            for y in range(0, height):
-                if not (tiles[x][y] == TileType.WALL) and not ((x, y) in friendly_tiles or (x, y) in enemy_tiles):
-                    neutral_tiles.append(Tile((x, y), Team.NEUTRAL, False))
+        :rtype: dict
+        """
+        return getattr(self.api, 'statistics', None)
 
-        team_to_tiles_map[Team.NEUTRAL] = neutral_tiles
+    def _create_uuid_to_friendlies_map(self, friendlies):
+        self.uuid_to_friendlies_map = {}
+        for unit in friendlies:
+            self.uuid_to_friendlies_map[unit.uuid] = unit
 
     def get_width(self):
         """
@@ -177,6 +192,28 @@ class World:
         """
         return self.api.get_shortest_path_distance(start, end)
 
+    def get_next_points_in_shortest_paths(self, pairs):
+        """
+        Batch version of get_next_point_in_shortest_path. Prefer this over calling
+        get_next_point_in_shortest_path in a loop when moving many units at once.
+
+        :param list pairs: list of (start, end) tuples, where start and end are (x,y) tuples
+        :return: list in which element i is the next point in the shortest path for pairs[i], or its start if there is no path
+        :rtype: list of (int, int)
+        """
+        return self.api.get_next_points_in_shortest_paths(pairs)
+
+    def get_shortest_path_distances(self, starts, ends):
+        """
+        Batch version of get_shortest_path_distance, computing the distance from every start to every end.
+
+        :param list starts: list of (x,y) sources
+        :param list ends: list of (x,y) targets
+        :return: matrix such that element [i][j] is the shortest path distance from starts[i] to ends[j], or 0 if there is no path
+        :rtype: list of list of int
+        """
+        return self.api.get_shortest_path_distances(starts, ends)
+
     def get_closest_enemy_from(self, point, excluding_units):
         """
         Returns the closest EnemyUnit from point, excluding any of the ones in excluding_units.
@@ -264,6 +301,55 @@ class World:
         """
         return self.api.get_closest_point_from(source, condition)
 
+    def get_distance_field(self, sources):
+        """
+        Runs a single breadth-first search from all sources at once. The resulting DistanceField gives, for every point,
+        the shortest path distance to the closest source and what that source represents, so that the closest target
+        of many units can be looked up without searching from each of them.
+
+        Note: when several sources are equally close, the one chosen may differ from the one that
+        get_closest_point_from would return.
+
+        :param sources: iterable of (x,y) tuples, or dictionary whose keys are (x,y) tuples and values are what get_nearest returns for them
+        :rtype: DistanceField
+        """
+        return self.api.get_distance_field(sources)
+
+    def get_enemy_distance_field(self):
+        """
+        :return: DistanceField whose sources are the positions of all EnemyUnits, and whose targets are the EnemyUnits
+        :rtype: DistanceField
+        """
+        return self.api.get_enemy_distance_field()
+
+    def get_friendly_distance_field(self):
+        """
+        :return: DistanceField whose sources are the positions of all FriendlyUnits, and whose targets are the FriendlyUnits
+        :rtype: DistanceField
+        """
+        return self.api.get_friendly_distance_field()
+
+    def get_enemy_nest_distance_field(self):
+        """
+        :return: DistanceField whose sources and targets are the positions of all enemy nests
+        :rtype: DistanceField
+        """
+        return self.api.get_enemy_nest_distance_field()
+
+    def get_friendly_nest_distance_field(self):
+        """
+        :return: DistanceField whose sources and targets are the positions of all friendly nests
+        :rtype: DistanceField
+        """
+        return self.api.get_friendly_nest_distance_field()
+
+    def get_capturable_tile_distance_field(self):
+        """
+        :return: DistanceField whose sources are the positions of all non-permanent enemy or neutral Tiles, and whose targets are the Tiles
+        :rtype: DistanceField
+        """
+        return self.api.get_capturable_tile_distance_field()
+
     def get_nest_positions(self):
         """
         :return: list of (x,y) tuples for all nests in current game state
@@ -0,0 +1,37 @@
+from PythonClientAPI.Game.OwnershipGrid import OwnershipGrid
+from PythonClientAPI.Game.World import World
+
+
+class WorldModel:
+    """
+    World state kept across turns. Each turn, update applies the tiles sent by the server to a copy of the last
+    OwnershipGrid, which only touches the cells whose owner or permanence changed. The Tiles, the list of neutral tiles
+    and the nest clusters are carried over to the new World instead of being rebuilt, while the previous World keeps
+    its own grid, so an AI still reading it never sees the ownership of a later turn.
+    Units are created anew every turn, since moves are assigned to them.
+    """
+    def __init__(self, tiles, api_class=None):
+        """
+        :param tiles: grid of TileType indexed as tiles[x][y]
+        :param type api_class: PlayerAPI class the Worlds are built with, or None for World.api_class
+        """
+        self.tiles = tiles
+        self.api_class = api_class
+        self.ownership_grid = OwnershipGrid(tiles, {})
+        self.world = None
+
+    def update(self, friendlies, enemies, team_to_tile_entries, team_to_nests_map):
+        """
+        Applies a new server state and returns the World for it.
+
+        :param list friendlies: FriendlyUnits of this turn
+        :param list enemies: EnemyUnits of this turn
+        :param dict team_to_tile_entries: maps Team.FRIENDLY and Team.ENEMY to lists of [x, y, permanent] entries as sent by the server
+        :param dict team_to_nests_map: maps Team.FRIENDLY and Team.ENEMY to lists of nest positions
+        :rtype: World
+        """
+        self.ownership_grid = self.ownership_grid.copy()
+        self.ownership_grid.update(team_to_tile_entries)
+        self.world = World(self.tiles, friendlies, enemies, {}, team_to_nests_map, self.ownership_grid, self.world,
+                           self.api_class)
+        return self.world
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+from PythonClientAPI.Game.Enums import Direction
+from PythonClientAPI.Navigation.NavigationCompiler import get_wall_data, get_neighbour_table, get_distances_to, \
+    get_direction_indices_to
+
+# Least number of per-target rows kept before the least recently used one is evicted
+DEFAULT_CAPACITY = 256
+# Number of tiles objects bind remembers as matching the current wall layout
+MAX_BOUND_TILES = 8
+# Entries (rows times cells) the cache grows to, so that every target of a small map fits while large maps stay bounded
+MAX_CACHED_ENTRIES = 1600 * 1600
+
+def get_default_capacity(cell_count):
+    """
+    :return: number of rows to keep for a map with cell_count cells: one per cell if that fits in MAX_CACHED_ENTRIES,
+        but never less than DEFAULT_CAPACITY
+    :rtype: int
+    """
+    return max(DEFAULT_CAPACITY, min(cell_count, MAX_CACHED_ENTRIES // max(cell_count, 1)))
+
+class LazyNavigationCache:
+    """
+    Stand-in for NavigationCache when no compiled navigation data is available.
+    The first query towards a target runs a single breadth-first search from it over the wall grid, and the resulting
+    row of distances and directions answers every later query towards that target.
+    The cache is shared by every do_move running at the same time, so the rows are only touched under a lock.
+    """
+    def __init__(self, capacity=None):
+        """
+        :param int capacity: number of rows to keep, or None to derive it from the size of the map with get_default_capacity
+        """
+        self.capacity = capacity
+        self.row_capacity = capacity or DEFAULT_CAPACITY
+        self.walls = b''
+        self.height = 0
+
+        self._tiles = None
+        self._bound_tiles = {}
+        self._neighbours = []
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bind(self, tiles):
+        """
+        Sets the map that queries are answered for. Rows are kept as long as the wall layout does not change, and
+        tiles objects already bound with the current layout are not read again, so clients alternating between their
+        own copies of the same map do not pay for it on every query.
+
+        :param tiles: grid of TileType indexed as tiles[x][y]
+        """
+        if self._bound_tiles.get(id(tiles)) is tiles: return
+        walls = get_wall_data(tiles)
+        height = len(tiles[0])
+        with self._lock:
+            if walls != self.walls or height != self.height:
+                self.walls = walls
+                self.height = height
+                self._neighbours = get_neighbour_table(len(tiles), height)
+                self._rows.clear()
+                self.row_capacity = self.capacity or get_default_capacity(len(walls))
+                self._bound_tiles = {}
+            if len(self._bound_tiles) >= MAX_BOUND_TILES: self._bound_tiles = {}
+            self._bound_tiles[id(tiles)] = tiles
+            self._tiles = tiles
+
+    def get_next_direction_in_path(self, position, target):
+        directions = self._get_row(target)[1]
+        return Direction.INDEX_TO_DIRECTION[directions[position[0] * self.height + position[1]]]
+
+    def get_distance(self, position, target):
+        distances = self._get_row(target)[0]
+        return max(distances[position[0] * self.height + position[1]], 0)
+
+    def get_row_count(self):
+        return len(self._rows)
+
+    def _get_row(self, target):
+        index = target[0] * self.height + target[1]
+        with self._lock:
+            row = self._rows.get(index)
+            if row is None:
+                distances = get_distances_to(index, self.walls, self._neighbours)
+                row = (distances, get_direction_indices_to(distances, self._neighbours))
+                self._rows[index] = row
+                if len(self._rows) > self.row_capacity:
+                    self._rows.popitem(last=False)
+            else:
+                self._rows.move_to_end(index)
+            return row
+
+lazy_navigation_cache = LazyNavigationCache()
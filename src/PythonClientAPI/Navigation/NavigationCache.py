@@ -1,29 +1,51 @@
+import mmap
+import os
 from zipfile import ZipFile
 
 from PythonClientAPI.Game.Enums import Direction
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+HEADER_SIZE = 5
+
+# Uncompressed copy of a .nac written next to it, so that it can be memory-mapped instead of decompressed.
+# Layout: magic, CRC-32 and size of the source "data" entry (4 bytes big-endian each), then the raw data.
+SIDECAR_EXTENSION = ".nav"
+SIDECAR_MAGIC = b"FFNAV1\x00\x00"
+SIDECAR_HEADER_SIZE = len(SIDECAR_MAGIC) + 8
+
 class NavigationCache:
     def __init__(self):
-        self.navigation_data = []
+        self.navigation_data = b''
+        self.dimensions = (0, 0, 0, 0, 0)
         self.loaded = False
 
+        self._strides = (0, 0, 0, 0)
+        self._array = None
+
     def deserialize_nav_data(self, array):
-        d1 = array[0]
-        d2 = array[1]
-        d3 = array[2]
-        d4 = array[3]
-        d5 = array[4]
-
-        data = [[[[[[] for i5 in range(d5)] for i4 in range(d4)] for i3 in range(d3)] for i2 in range(d2)] for i1 in range(d1)]
-        for i1 in range(d1):
-            for i2 in range(d2):
-                for i3 in range(d3):
-                    for i4 in range(d4):
-                        for i5 in range(d5):
-                            index = 5 + i1 * d2 * d3 * d4 * d5 + i2 * d3 * d4 * d5 + i3 * d4 * d5 + i4 * d5 + i5
-                            data[i1][i2][i3][i4][i5] = [array[index]]
-
-        return data
+        """
+        Reads the dimensions header of the compiled navigation data and returns a flat view over the payload.
+        Entries are laid out as [x1][y1][x2][y2][(direction, distance)] and are indexed arithmetically.
+
+        :param bytes array: raw compiled navigation data
+        :return: view of the payload without the header
+        :rtype: memoryview
+        """
+        d1, d2, d3, d4, d5 = array[0], array[1], array[2], array[3], array[4]
+
+        expected_size = HEADER_SIZE + d1 * d2 * d3 * d4 * d5
+        if len(array) != expected_size:
+            raise EOFError("Expected " + str(expected_size) + " bytes, got " + str(len(array)))
+
+        self.dimensions = (d1, d2, d3, d4, d5)
+        self._strides = (d2 * d3 * d4 * d5, d3 * d4 * d5, d4 * d5, d5)
+        self._array = None
+
+        return memoryview(array)[HEADER_SIZE:]
 
     def load_compiled_data(self, file):
         with ZipFile(file) as zip_file:
@@ -39,10 +61,155 @@ class NavigationCache:
             self.navigation_data = self.deserialize_nav_data(data)
             self.loaded = True
 
+    def load_navigation_data(self, file, use_sidecar=True):
+        """
+        Loads the navigation data for the .nac at file. If use_sidecar is True, the uncompressed sidecar next to it
+        is memory-mapped when it matches the .nac, and written from it otherwise so that later launches can map it.
+
+        :param str file: path to the .nac file
+        :param bool use_sidecar: whether to read and write the uncompressed sidecar
+        """
+        if use_sidecar:
+            sidecar_file = get_sidecar_path(file)
+            try:
+                if os.path.isfile(sidecar_file) and self.load_mapped_data(sidecar_file, file):
+                    return
+            except OSError:
+                pass
+            try:
+                write_sidecar(file, sidecar_file)
+                if self.load_mapped_data(sidecar_file, file):
+                    return
+            except OSError:
+                pass
+        self.load_compiled_data(file)
+
+    def load_mapped_data(self, sidecar_file, source_file):
+        """
+        Memory-maps the sidecar at sidecar_file, provided that it was written from the .nac at source_file.
+
+        :param str sidecar_file: path to the uncompressed sidecar
+        :param str source_file: path to the .nac the sidecar should match
+        :return: True iff the sidecar matched and was loaded
+        :rtype: bool
+        """
+        with ZipFile(source_file) as zip_file:
+            expected_header = get_sidecar_header(zip_file.getinfo("data"))
+
+        with open(sidecar_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size <= SIDECAR_HEADER_SIZE:
+                return False
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped[:SIDECAR_HEADER_SIZE] != expected_header:
+            mapped.close()
+            return False
+
+        view = memoryview(mapped)[SIDECAR_HEADER_SIZE:]
+        try:
+            self.navigation_data = self.deserialize_nav_data(view)
+        except EOFError:
+            # the map cannot be closed while a view of it is still exported
+            view.release()
+            mapped.close()
+            return False
+        self.loaded = True
+        return True
+
+    def _get_offset(self, position, target):
+        s1, s2, s3, s4 = self._strides
+        return position[0] * s1 + position[1] * s2 + target[0] * s3 + target[1] * s4
+
     def get_next_direction_in_path(self, position, target):
-        return Direction.INDEX_TO_DIRECTION[self.navigation_data[position[0]][position[1]][target[0]][target[1]][0][0]]
+        return Direction.INDEX_TO_DIRECTION[self.navigation_data[self._get_offset(position, target)]]
 
     def get_distance(self, position, target):
-        return self.navigation_data[position[0]][position[1]][target[0]][target[1]][1][0]
+        return self.navigation_data[self._get_offset(position, target) + 1]
+
+    def get_distances(self, positions, targets):
+        """
+        :param list positions: list of (x,y) sources
+        :param list targets: list of (x,y) targets
+        :return: matrix such that element [i][j] is the distance from positions[i] to targets[j]
+        :rtype: list of list of int
+        """
+        if not positions or not targets: return [[] for position in positions]
+        if numpy is not None:
+            array = self._get_array()
+            sources = numpy.array(positions, dtype=numpy.intp)
+            destinations = numpy.array(targets, dtype=numpy.intp)
+            return array[sources[:, 0, None], sources[:, 1, None], destinations[None, :, 0], destinations[None, :, 1], 1].tolist()
+
+        data = self.navigation_data
+        s1, s2, s3, s4 = self._strides
+        target_offsets = [target[0] * s3 + target[1] * s4 + 1 for target in targets]
+        distances = []
+        for position in positions:
+            source_offset = position[0] * s1 + position[1] * s2
+            distances.append([data[source_offset + target_offset] for target_offset in target_offsets])
+        return distances
+
+    def get_next_direction_indices(self, positions, targets):
+        """
+        :param list positions: list of (x,y) sources
+        :param list targets: list of (x,y) targets, paired element-wise with positions
+        :return: index (see Direction.INDEX_TO_DIRECTION) of the next direction from positions[i] towards targets[i]
+        :rtype: list of int
+        """
+        if not positions: return []
+        if numpy is not None:
+            array = self._get_array()
+            sources = numpy.array(positions, dtype=numpy.intp)
+            destinations = numpy.array(targets, dtype=numpy.intp)
+            return array[sources[:, 0], sources[:, 1], destinations[:, 0], destinations[:, 1], 0].tolist()
+
+        data = self.navigation_data
+        s1, s2, s3, s4 = self._strides
+        return [data[position[0] * s1 + position[1] * s2 + target[0] * s3 + target[1] * s4]
+                for position, target in zip(positions, targets)]
+
+    def get_next_directions_in_path(self, positions, targets):
+        """
+        :param list positions: list of (x,y) sources
+        :param list targets: list of (x,y) targets, paired element-wise with positions
+        :return: next Direction from positions[i] towards targets[i]
+        :rtype: list of Direction
+        """
+        index_to_direction = Direction.INDEX_TO_DIRECTION
+        return [index_to_direction[index] for index in self.get_next_direction_indices(positions, targets)]
+
+    def _get_array(self):
+        # read-only NumPy view over the navigation data, shaped by its header
+        if self._array is None:
+            self._array = numpy.frombuffer(self.navigation_data, dtype=numpy.uint8).reshape(self.dimensions)
+        return self._array
+
+def get_sidecar_path(file):
+    return os.path.splitext(file)[0] + SIDECAR_EXTENSION
+
+def get_sidecar_header(info):
+    return SIDECAR_MAGIC + info.CRC.to_bytes(4, 'big') + info.file_size.to_bytes(4, 'big')
+
+def write_sidecar(source_file, sidecar_file):
+    """
+    Writes the uncompressed sidecar for the .nac at source_file. The file is written under a temporary name
+    and then renamed, so that other clients never map a partially written sidecar.
+
+    :param str source_file: path to the .nac file
+    :param str sidecar_file: path of the sidecar to write
+    """
+    with ZipFile(source_file) as zip_file:
+        info = zip_file.getinfo("data")
+        data = zip_file.read("data")
+
+    temp_file = sidecar_file + "." + str(os.getpid()) + ".tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(get_sidecar_header(info))
+            f.write(data)
+        os.replace(temp_file, sidecar_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
 
-navigation_cache = NavigationCache()
\ No newline at end of file
+navigation_cache = NavigationCache()
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sys
+from collections import deque
+from multiprocessing import Pool
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from PythonClientAPI.Game.Enums import TileType, Direction
+from PythonClientAPI.Navigation.NavigationCache import navigation_cache
+
+# Largest value that fits in a single byte of the compiled format (dimensions and distances)
+MAX_ENCODED_VALUE = 255
+WALL_COLOUR = b'\x00\x00\x00'
+# Order in which FF-Map-Compiler.jar breaks ties between equally short paths
+COMPILE_DIRECTIONS = [Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST]
+COMPILE_DIRECTION_INDICES = [Direction.DIRECTION_TO_INDEX[direction] for direction in COMPILE_DIRECTIONS]
+
+def compile_nav_data(tiles, processes=1):
+    """
+    Builds navigation data in the same layout as the one produced by FF-Map-Compiler.jar:
+    a 5 byte header (width, height, width, height, 2) followed by a (direction index, distance) pair
+    for every [x1][y1][x2][y2]. Unreachable pairs and walls are (0, 0), and ties between shortest paths
+    are broken in the order NORTH, EAST, SOUTH, WEST.
+
+    :param tiles: grid of TileType indexed as tiles[x][y]
+    :param int processes: number of worker processes to spread the breadth-first searches over
+    :return: compiled navigation data
+    :rtype: bytes
+    """
+    width = len(tiles)
+    height = len(tiles[0])
+    if width > MAX_ENCODED_VALUE or height > MAX_ENCODED_VALUE:
+        raise ValueError("Map of size {0}x{1} is too large for navigation data".format(width, height))
+
+    walls = get_wall_data(tiles)
+    cell_count = width * height
+
+    if processes > 1:
+        chunks = [(walls, width, height, range(first, cell_count, processes)) for first in range(processes)]
+        with Pool(processes) as pool:
+            results = pool.starmap(_compile_columns, chunks)
+    else:
+        results = [_compile_columns(walls, width, height, range(cell_count))]
+
+    data = bytearray(5 + cell_count * cell_count * 2)
+    data[0:5] = bytes((width, height, width, height, 2))
+    for columns in results:
+        for target, column in columns:
+            # column holds the entries of every source for this target, which are cell_count * 2 bytes apart
+            data[5 + target * 2::cell_count * 2] = column[0::2]
+            data[6 + target * 2::cell_count * 2] = column[1::2]
+    return bytes(data)
+
+def get_wall_data(tiles):
+    """
+    :param tiles: grid of TileType indexed as tiles[x][y]
+    :return: one byte per cell, indexed by x * height + y, which is 1 iff the cell is a wall
+    :rtype: bytes
+    """
+    return bytes(1 if tile == TileType.WALL else 0 for column in tiles for tile in column)
+
+def get_neighbour_table(width, height):
+    """
+    :return: for every cell index, a tuple of the indices of its NORTH, EAST, SOUTH and WEST neighbours
+    :rtype: list of tuple
+    """
+    neighbours = []
+    for x in range(width):
+        for y in range(height):
+            neighbours.append(tuple(((x + dx) % width) * height + (y + dy) % height
+                                    for dx, dy in (direction.value for direction in COMPILE_DIRECTIONS)))
+    return neighbours
+
+def _compile_columns(walls, width, height, targets):
+    neighbours = get_neighbour_table(width, height)
+    return [(target, bytes(compile_column(target, walls, neighbours))) for target in targets]
+
+def compile_column(target, walls, neighbours):
+    """
+    Runs a single breadth-first search from target and returns the entries of every source for that target.
+
+    :param int target: cell index of the target
+    :param bytes walls: wall data as returned by get_wall_data
+    :param list neighbours: neighbour table as returned by get_neighbour_table
+    :return: (direction index, distance) pair for every source cell index, flattened
+    :rtype: bytearray
+    """
+    column = bytearray(len(walls) * 2)
+    if walls[target]:
+        return column
+
+    distances = get_distances_to(target, walls, neighbours)
+    if max(distances) > MAX_ENCODED_VALUE:
+        raise ValueError("Distance {0} is too large for navigation data".format(max(distances)))
+
+    column[0::2] = get_direction_indices_to(distances, neighbours)
+    column[1::2] = bytes(max(distance, 0) for distance in distances)
+    return column
+
+def get_distances_to(target, walls, neighbours):
+    """
+    :param int target: cell index of the target
+    :param bytes walls: wall data as returned by get_wall_data
+    :param list neighbours: neighbour table as returned by get_neighbour_table
+    :return: distance from every cell index to target, or -1 if target cannot be reached from it
+    :rtype: list of int
+    """
+    distances = [-1] * len(walls)
+    if walls[target]:
+        return distances
+
+    distances[target] = 0
+    queue = deque([target])
+    while queue:
+        cursor = queue.popleft()
+        distance = distances[cursor] + 1
+        for neighbour in neighbours[cursor]:
+            if distances[neighbour] < 0 and not walls[neighbour]:
+                distances[neighbour] = distance
+                queue.append(neighbour)
+    return distances
+
+def get_direction_indices_to(distances, neighbours):
+    """
+    :param list distances: distances to a target as returned by get_distances_to
+    :param list neighbours: neighbour table as returned by get_neighbour_table
+    :return: index of the first direction in COMPILE_DIRECTIONS that leads closer to the target for every cell index,
+        or the index of Direction.NOWHERE if there is none
+    :rtype: bytearray
+    """
+    directions = bytearray(len(distances))
+    for source, distance in enumerate(distances):
+        if distance <= 0: continue
+        for index, neighbour in zip(COMPILE_DIRECTION_INDICES, neighbours[source]):
+            if distances[neighbour] == distance - 1:
+                directions[source] = index
+                break
+    return directions
+
+def get_map_hash(tiles):
+    """
+    :param tiles: grid of TileType indexed as tiles[x][y]
+    :return: hex digest identifying the size and wall layout of the map
+    :rtype: str
+    """
+    digest = hashlib.sha1("{0}x{1}:".format(len(tiles), len(tiles[0])).encode())
+    digest.update(get_wall_data(tiles))
+    return digest.hexdigest()
+
+def read_bitmap_tiles(file):
+    """
+    Reads a map from an uncompressed 24-bit bitmap, where black pixels are walls.
+
+    :param str file: path to the .bmp file
+    :return: grid of TileType indexed as tiles[x][y]
+    """
+    with open(file, 'rb') as f:
+        data = f.read()
+
+    if data[0:2] != b'BM' or int.from_bytes(data[28:30], 'little') != 24:
+        raise ValueError("Expected a 24-bit bitmap: " + file)
+
+    offset = int.from_bytes(data[10:14], 'little')
+    width = int.from_bytes(data[18:22], 'little', signed=True)
+    height = int.from_bytes(data[22:26], 'little', signed=True)
+    row_size = (width * 3 + 3) // 4 * 4
+
+    tiles = [[TileType.TILE] * abs(height) for x in range(width)]
+    for row in range(abs(height)):
+        # rows are stored bottom-up unless the height is negative
+        y = abs(height) - 1 - row if height > 0 else row
+        start = offset + row * row_size
+        for x in range(width):
+            if data[start + x * 3:start + x * 3 + 3] == WALL_COLOUR:
+                tiles[x][y] = TileType.WALL
+    return tiles
+
+def write_compiled_data(data, file):
+    temp_file = file + "." + str(os.getpid()) + ".tmp"
+    try:
+        with ZipFile(temp_file, 'w', ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("data", data)
+        os.replace(temp_file, file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+def load_or_compile(tiles, cache_directory, processes=1, cell_limit=None):
+    """
+    Loads navigation data for tiles into the navigation cache, compiling it first if the cache directory
+    does not hold data for a map with the same wall layout yet.
+
+    :param tiles: grid of TileType indexed as tiles[x][y]
+    :param str cache_directory: directory in which compiled navigation data is kept, keyed by map hash
+    :param int processes: number of worker processes to compile with
+    :param int cell_limit: largest number of cells to compile for, or None to compile maps of any size
+    :return: path to the compiled navigation data, or None if the map has more than cell_limit cells
+        and has not been compiled yet
+    :rtype: str
+    """
+    file = os.path.join(cache_directory, get_map_hash(tiles) + ".nac")
+    if not os.path.isfile(file):
+        if cell_limit is not None and len(tiles) * len(tiles[0]) > cell_limit:
+            return None
+        write_compiled_data(compile_nav_data(tiles, processes), file)
+    navigation_cache.load_navigation_data(file)
+    return file
+
+if __name__ == '__main__':
+    for bitmap in sys.argv[1:]:
+        output = os.path.splitext(bitmap)[0] + ".nac"
+        write_compiled_data(compile_nav_data(read_bitmap_tiles(bitmap), os.cpu_count() or 1), output)
+        print("Compiled " + output)
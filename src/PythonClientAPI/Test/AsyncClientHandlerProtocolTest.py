@@ -0,0 +1,110 @@
+from unittest import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import PythonClientAPI.Communication.CommunicatorConstants as cc
+import PythonClientAPI.Configurator.Constants as constants
+from PythonClientAPI.Benchmarks.MockServer import run
+from PythonClientAPI.Communication.GameRecorder import read_recording
+from PythonClientAPI.Communication.Signals import Signals
+from PythonClientAPI.Game import NeighbourTable
+from PythonClientAPI.Game.Enums import Direction
+from PythonClientAPI.Game.PlayerAPI import PlayerAPI
+from PythonClientAPI.Game.World import World
+from PythonClientAPI.Navigation import LazyNavigationCache
+from PythonClientAPI.Navigation.NavigationCache import navigation_cache
+from PythonClientAPI.Navigation.NavigationCompiler import get_wall_data
+
+
+class SlowFirstTurnAI:
+    def __init__(self):
+        self.turns = 0
+
+    def do_move(self, world, friendly_units, enemy_units):
+        self.turns += 1
+        if self.turns == 1: time.sleep(1)
+
+
+class PathFindingAI:
+    counts = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.turns = 0
+
+    def do_move(self, world, friendly_units, enemy_units):
+        self.turns += 1
+        for unit in friendly_units:
+            world.get_shortest_path_distance(unit.position, enemy_units[0].position)
+        with self.lock:
+            self.counts.append((self.turns, NeighbourTable.NeighbourTable.call_count,
+                                LazyNavigationCache.get_wall_data.call_count))
+
+
+class TestAsyncClientHandlerProtocol(TestCase):
+
+    def setUp(self):
+        self.ordered_directions = Direction.ORDERED_DIRECTIONS
+        self.max_response_time = cc.MAXIMUM_ALLOWED_RESPONSE_TIME
+
+    def tearDown(self):
+        Direction.ORDERED_DIRECTIONS = self.ordered_directions
+        cc.MAXIMUM_ALLOWED_RESPONSE_TIME = self.max_response_time
+
+    def test_concurrent_clients_play_every_turn(self):
+        server = run(clients=3, turns=4)
+        self.assertEqual(3, len(server.responses))
+        for responses, round_trips in zip(server.responses, server.round_trips):
+            self.assertEqual(4, len(round_trips))
+            for response in responses:
+                self.assertTrue(any(json.loads(response)['uuidToCoreMap']))
+
+    def test_timed_out_ai_sends_assigned_moves_and_is_waited_on(self):
+        # turns last 250 ms, so the AI is busy for all of the second turn and done well before the last one
+        server = run(clients=1, turns=8, create_player_ai=SlowFirstTurnAI, max_response_time=300)
+        responses = server.responses[0]
+        self.assertEqual({'uuidToCoreMap': {}}, json.loads(responses[0]))
+        self.assertEqual(Signals.NO_RESPONSE.name, responses[1])
+        self.assertNotEqual(Signals.NO_RESPONSE.name, responses[-1])
+        self.assertEqual(8, len(responses))
+
+    def test_concurrent_clients_do_not_rebuild_map_data_after_first_turn(self):
+        PathFindingAI.counts = []
+        with mock.patch.object(navigation_cache, 'loaded', False), \
+                mock.patch.object(NeighbourTable, 'NeighbourTable', wraps=NeighbourTable.NeighbourTable), \
+                mock.patch.object(LazyNavigationCache, 'get_wall_data', wraps=get_wall_data):
+            run(clients=2, turns=6, create_player_ai=PathFindingAI)
+
+        self.assertEqual(12, len(PathFindingAI.counts))
+        warm = max(counts[1:] for counts in PathFindingAI.counts if counts[0] == 1)
+        self.assertEqual([warm], list({counts[1:] for counts in PathFindingAI.counts if counts[0] > 1}))
+        self.assertLessEqual(warm[0], 1)
+
+    def test_game_is_recorded_with_api_statistics(self):
+        with tempfile.TemporaryDirectory() as directory:
+            constants.RECORDING_FILE = os.path.join(directory, "game.jsonl.gz")
+            constants.API_STATISTICS_FILE = os.path.join(directory, "api.jsonl")
+            try:
+                server = run(clients=2, turns=3)
+            finally:
+                constants.RECORDING_FILE = ""
+                constants.API_STATISTICS_FILE = ""
+            self.assertIs(PlayerAPI, World.api_class)
+
+            for client in range(2):
+                recording = read_recording(os.path.join(directory, "game_{0}.jsonl.gz".format(client)))
+                self.assertIsNotNone(recording.initial_state_message)
+                self.assertEqual(server.responses[client], [turn['response'] for turn in recording.turns])
+                self.assertEqual([0, 1, 2], [turn['turn'] for turn in recording.turns])
+                with open(os.path.join(directory, "api_{0}.jsonl".format(client))) as f:
+                    statistics = [json.loads(line) for line in f]
+                self.assertEqual([0, 1, 2], [turn_statistics['turn'] for turn_statistics in statistics])
+                self.assertTrue(all(turn_statistics['methods'] for turn_statistics in statistics))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+from unittest import TestCase
+import socket
+import threading
+import unittest
+
+from PythonClientAPI.Benchmarks.ChannelBenchmark import run
+from PythonClientAPI.Communication.ClientChannelHandler import ClientChannelHandler, RECEIVE_BUFFER_SIZE
+
+
+class TestClientChannelHandler(TestCase):
+
+    def setUp(self):
+        self.client_socket, self.server_socket = socket.socketpair()
+        self.client = self.create_channel(self.client_socket)
+        self.server = self.create_channel(self.server_socket)
+
+    def tearDown(self):
+        self.client_socket.close()
+        self.server_socket.close()
+
+    def create_channel(self, sock):
+        channel = ClientChannelHandler()
+        channel.sock = sock
+        channel.connected = True
+        return channel
+
+    def test_messages_are_framed(self):
+        for message in ["MOVE", "{\"a\": [1, 2]}", "été"]:
+            self.server.send_message(message)
+        self.assertEqual(["MOVE", "{\"a\": [1, 2]}", "été"], [self.client.receive_message() for i in range(3)])
+
+    def test_receive_buffer_grows_for_large_messages(self):
+        message = "x" * (RECEIVE_BUFFER_SIZE * 3)
+        sender = threading.Thread(target=self.server.send_message, args=(message,))
+        sender.start()
+        self.assertEqual(message, self.client.receive_message())
+        sender.join()
+        self.server.send_message("END")
+        self.assertEqual("END", self.client.receive_message())
+
+    def test_closed_connection_is_reported(self):
+        self.server_socket.sendall((10).to_bytes(4, 'big') + b"short")
+        self.server_socket.close()
+        with self.assertRaises(Exception):
+            self.client.receive_message()
+        self.assertFalse(self.client.connected)
+
+    def test_benchmark_runs(self):
+        results = run(turns=2, stage='early')
+        self.assertEqual(["legacy", "current"], [result[0] for result in results])
+
+if __name__ == '__main__':
+    unittest.main()
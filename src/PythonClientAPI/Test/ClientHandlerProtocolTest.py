@@ -0,0 +1,348 @@
+from unittest import TestCase
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import PythonClientAPI.Communication.CommunicatorConstants as cc
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Benchmarks.GameStates import GAME_STAGES, get_map_names, create_game_state_message
+from PythonClientAPI.Benchmarks.MockServer import StandInAI
+from PythonClientAPI.Benchmarks import Replay, SnapshotBenchmark
+from PythonClientAPI.Communication.ClientHandlerProtocol import ClientHandlerProtocol
+from PythonClientAPI.Communication.GameRecorder import read_recording
+from PythonClientAPI.Communication.Signals import Signals
+from PythonClientAPI.Communication.TurnTimings import PHASES
+from PythonClientAPI.Game import NeighbourTable
+from PythonClientAPI.Game.Enums import Direction, TileType
+from PythonClientAPI.Game.GameState import PlayerTurnActionInfo
+from PythonClientAPI.Game.PlayerAPI import PlayerAPI
+from PythonClientAPI.Game.World import World
+from PythonClientAPI.Navigation.LazyNavigationCache import lazy_navigation_cache
+
+
+class SlowAI(StandInAI):
+    def __init__(self, delays):
+        self.delays = list(delays)
+
+    def do_move(self, world, friendly_units, enemy_units):
+        time.sleep(self.delays.pop(0))
+        super().do_move(world, friendly_units, enemy_units)
+
+
+class BlockedAI(StandInAI):
+    """
+    Does not return from its first turn until released, so that it times out however slow the machine is.
+    """
+    def __init__(self):
+        self.released = threading.Event()
+        self.turns = 0
+
+    def do_move(self, world, friendly_units, enemy_units):
+        self.turns += 1
+        if self.turns == 1: self.released.wait(5)
+        super().do_move(world, friendly_units, enemy_units)
+
+
+class OverrunningAI:
+    def __init__(self):
+        self.released = threading.Event()
+
+    def do_move(self, world, friendly_units, enemy_units):
+        unit = friendly_units[0]
+        neighbour = next(p for p in world.get_neighbours(unit.position).values() if not world.is_wall(p))
+        world.move(unit, neighbour)
+        self.remaining_time = world.get_remaining_time()
+        self.released.wait(5)
+        world.move(friendly_units[1], friendly_units[1].position)
+
+
+class ReassigningAI:
+    def __init__(self):
+        self.released = threading.Event()
+        self.done = threading.Event()
+
+    def do_move(self, world, friendly_units, enemy_units):
+        unit = friendly_units[0]
+        neighbours = [p for p in world.get_neighbours(unit.position).values() if not world.is_wall(p)]
+        world.move(unit, neighbours[0])
+        self.first_target = unit.get_next_move_target()
+        self.released.wait(5)
+        world.move(unit, neighbours[1])
+        for other_unit in friendly_units[1:]:
+            other_neighbour = next(p for p in world.get_neighbours(other_unit.position).values() if not world.is_wall(p))
+            world.move(other_unit, other_neighbour)
+        self.done.set()
+
+
+class IdleAI:
+    def do_move(self, world, friendly_units, enemy_units):
+        pass
+
+
+class FakeChannelHandler:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    def receive_message(self):
+        return self.messages.pop(0)
+
+    def send_message(self, message):
+        self.sent.append(message)
+
+    def close_connection(self):
+        pass
+
+
+class TestClientHandlerProtocol(TestCase):
+
+    def setUp(self):
+        self.ordered_directions = Direction.ORDERED_DIRECTIONS
+        tiles = [[TileType.WALL.name if (x, y) == (2, 3) else TileType.TILE.name for y in range(5)] for x in range(4)]
+        self.message = json.dumps({'tiles': tiles,
+                                   'uuidToOrderedDirections': {'Red': ['WEST', 'SOUTH', 'EAST', 'NORTH'],
+                                                               'Blue': ['NORTH', 'EAST', 'SOUTH', 'WEST']}})
+
+        self.max_response_time = cc.MAXIMUM_ALLOWED_RESPONSE_TIME
+
+    def tearDown(self):
+        Direction.ORDERED_DIRECTIONS = self.ordered_directions
+        cc.MAXIMUM_ALLOWED_RESPONSE_TIME = self.max_response_time
+
+    def create_game_states(self, protocol, turns):
+        return [JSON.parse_game_state(create_game_state_message(protocol.tiles, 'mid', constants.LOCAL_PLAYER_UUID, turn),
+                                      protocol.tiles) for turn in range(turns)]
+
+    def test_parse_initial_state(self):
+        initial_state = JSON.parse_initial_state(self.message, 'Red')
+        self.assertEqual(4, len(initial_state.tiles))
+        self.assertEqual(TileType.WALL, initial_state.tiles[2][3])
+        self.assertEqual([Direction.WEST, Direction.SOUTH, Direction.EAST, Direction.NORTH], initial_state.ordered_directions)
+
+    def test_initial_state_is_prepared_before_first_turn(self):
+        protocol = ClientHandlerProtocol(None, 0, 600, 'Red')
+        protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+
+        self.assertEqual([Direction.WEST, Direction.SOUTH, Direction.EAST, Direction.NORTH], Direction.ORDERED_DIRECTIONS)
+        self.assertIs(protocol.tiles, protocol.world_model.tiles)
+        self.assertIs(protocol.tiles, NeighbourTable._layouts[id(protocol.tiles)][0])
+        with mock.patch.object(NeighbourTable, 'NeighbourTable') as neighbour_table:
+            table = NeighbourTable.get_neighbour_table(protocol.tiles)
+        neighbour_table.assert_not_called()
+        self.assertEqual(tuple(Direction.ORDERED_DIRECTIONS), table.directions)
+        self.assertIs(protocol.tiles, lazy_navigation_cache._tiles)
+
+    def test_large_maps_are_not_compiled_before_ready(self):
+        tiles = [[TileType.TILE.name for y in range(60)] for x in range(60)]
+        message = json.dumps({'tiles': tiles, 'uuidToOrderedDirections': {'Red': ['NORTH', 'EAST', 'SOUTH', 'WEST']}})
+        with tempfile.TemporaryDirectory() as directory:
+            constants.NAVIGATION_CACHE_DIRECTORY = directory
+            try:
+                protocol = ClientHandlerProtocol(StandInAI(), 0, 600, 'Red')
+                start_time = time.time()
+                protocol.prepare_initial_state(JSON.parse_initial_state(message, 'Red'))
+                self.assertLess(time.time() - start_time, 1)
+            finally:
+                constants.NAVIGATION_CACHE_DIRECTORY = ""
+            self.assertEqual([], os.listdir(directory))
+        self.assertIs(protocol.tiles, lazy_navigation_cache._tiles)
+
+    def test_ai_runs_on_a_single_worker(self):
+        protocol = ClientHandlerProtocol(StandInAI(), 0, 600, 'Red')
+        protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+        thread_count = threading.active_count()
+        try:
+            for game_state in self.create_game_states(protocol, 3):
+                move = protocol.get_timed_ai_response(game_state)
+                self.assertIsInstance(move, PlayerTurnActionInfo)
+                self.assertEqual(thread_count + 1, threading.active_count())
+        finally:
+            protocol.ai_worker.stop()
+        protocol.ai_worker.join(1)
+        self.assertFalse(protocol.ai_worker.is_alive())
+
+    def test_timed_out_ai_is_waited_on_next_turns(self):
+        player_ai = BlockedAI()
+        protocol = ClientHandlerProtocol(player_ai, 0, 300, 'Red')
+        protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+        game_states = self.create_game_states(protocol, 4)
+        try:
+            # the first turn passes without any move assigned, and the next one with the AI still busy
+            self.assertEqual({}, protocol.get_timed_ai_response(game_states[0]).uuid_to_core_map)
+            self.assertFalse(protocol.ai_responded)
+            self.assertEqual(Signals.NO_RESPONSE.name, protocol.get_timed_ai_response(game_states[1]))
+            player_ai.released.set()
+            stale_move = protocol.get_timed_ai_response(game_states[2])
+            self.assertIsInstance(stale_move, PlayerTurnActionInfo)
+            for uuid, move in stale_move.uuid_to_core_map.items():
+                target = game_states[0].world.get_unit(uuid).get_next_move_target()
+                self.assertEqual({'x': target[0], 'y': target[1]}, move['nextMoveTarget'])
+            self.assertTrue(protocol.ai_responded)
+            self.assertIsInstance(protocol.get_timed_ai_response(game_states[3]), PlayerTurnActionInfo)
+        finally:
+            player_ai.released.set()
+            protocol.ai_worker.stop()
+
+    def test_moves_assigned_before_deadline_are_sent(self):
+        player_ai = OverrunningAI()
+        protocol = ClientHandlerProtocol(player_ai, 0, 300, 'Red')
+        protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+        game_state = self.create_game_states(protocol, 1)[0]
+        try:
+            move = protocol.get_timed_ai_response(game_state)
+        finally:
+            player_ai.released.set()
+            protocol.ai_worker.stop()
+
+        first_unit = sorted(game_state.world.api.friendlies, key=lambda unit: unit.health)[0]
+        self.assertEqual([first_unit.uuid], list(move.uuid_to_core_map))
+        self.assertFalse(protocol.ai_responded)
+        self.assertTrue(0 < player_ai.remaining_time <= 250)
+
+    def test_moves_assigned_after_deadline_are_not_sent(self):
+        player_ai = ReassigningAI()
+        protocol = ClientHandlerProtocol(player_ai, 0, 300, 'Red')
+        protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+        game_state = self.create_game_states(protocol, 1)[0]
+        try:
+            move = protocol.get_timed_ai_response(game_state)
+            player_ai.released.set()
+            self.assertTrue(player_ai.done.wait(5))
+        finally:
+            player_ai.released.set()
+            protocol.ai_worker.stop()
+
+        first_unit = sorted(game_state.world.api.friendlies, key=lambda unit: unit.health)[0]
+        self.assertNotEqual(player_ai.first_target, first_unit.get_next_move_target())
+        sent = json.loads(json.dumps(move, cls=JSON.FFEncoder))['uuidToCoreMap']
+        self.assertEqual([first_unit.uuid], list(sent))
+        self.assertEqual({'x': player_ai.first_target[0], 'y': player_ai.first_target[1]}, sent[first_unit.uuid]['nextMoveTarget'])
+        self.assertEqual('MOVE', sent[first_unit.uuid]['nextMoveType'])
+
+    def test_remaining_time(self):
+        protocol = ClientHandlerProtocol(StandInAI(), 0, 600, 'Red')
+        protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+        world = self.create_game_states(protocol, 1)[0].world
+        self.assertEqual(float('inf'), world.get_remaining_time())
+        world.set_deadline(time.time() + 0.2)
+        self.assertTrue(100 < world.get_remaining_time() <= 200)
+        world.set_deadline(time.time() - 1)
+        self.assertEqual(0, world.get_remaining_time())
+
+    def test_turns_are_timed_and_profiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            constants.PROFILE_DIRECTORY = directory
+            constants.TIMINGS_FILE = os.path.join(directory, "timings.jsonl")
+            try:
+                protocol = ClientHandlerProtocol(StandInAI(), 0, 600, 'Red')
+                protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+                messages = [create_game_state_message(protocol.tiles, 'mid', constants.LOCAL_PLAYER_UUID, turn) for turn in range(2)]
+                protocol.client_channel_handler = FakeChannelHandler(messages)
+                protocol.next_move_from_client()
+                protocol.next_move_from_client()
+                protocol.ai_worker.stop()
+            finally:
+                constants.PROFILE_DIRECTORY = ""
+                constants.TIMINGS_FILE = ""
+
+            with open(os.path.join(directory, "timings.jsonl")) as f:
+                timings = [json.loads(line) for line in f]
+            self.assertEqual([0, 1], [timing['turn'] for timing in timings])
+            for timing in timings:
+                self.assertTrue(all(timing[phase] >= 0 for phase in PHASES))
+                self.assertAlmostEqual(sum(timing[phase] for phase in PHASES), timing['total'], places=2)
+                self.assertTrue(timing['responded'])
+            self.assertEqual(2, len(protocol.client_channel_handler.sent))
+            self.assertTrue(pstats.Stats(os.path.join(directory, "turn_1.prof")).total_calls > 0)
+
+    def test_api_statistics_are_written_at_end(self):
+        with tempfile.TemporaryDirectory() as directory:
+            constants.API_STATISTICS_FILE = os.path.join(directory, "api.jsonl")
+            try:
+                protocol = ClientHandlerProtocol(StandInAI(), 0, 600, 'Red')
+                protocol.prepare_initial_state(JSON.parse_initial_state(self.message, 'Red'))
+                messages = [create_game_state_message(protocol.tiles, 'mid', constants.LOCAL_PLAYER_UUID, turn) for turn in range(2)]
+                protocol.client_channel_handler = FakeChannelHandler(messages)
+                protocol.next_move_from_client()
+                protocol.next_move_from_client()
+                protocol.end_communications()
+            finally:
+                constants.API_STATISTICS_FILE = ""
+            self.assertIs(PlayerAPI, World.api_class)
+
+            with open(os.path.join(directory, "api.jsonl")) as f:
+                statistics = [json.loads(line) for line in f]
+            self.assertEqual([0, 1], [turn_statistics['turn'] for turn_statistics in statistics])
+            for turn_statistics in statistics:
+                methods = turn_statistics['methods']
+                self.assertGreater(methods['get_closest_capturable_tile_from']['calls'], 0)
+                self.assertGreater(methods['get_closest_capturable_tile_from']['nodes_expanded'], 0)
+                self.assertEqual(methods['get_closest_capturable_tile_from']['calls'],
+                                 sum(methods['get_closest_capturable_tile_from']['latencies'].values()))
+
+    def test_client_files_are_named_after_the_client_index(self):
+        file = os.path.join('recordings', 'game.jsonl.gz')
+        self.assertEqual(file, ClientHandlerProtocol(None, 0, 600, 'Red').get_client_file(file))
+        self.assertEqual(os.path.join('recordings', 'game_2.jsonl.gz'),
+                         ClientHandlerProtocol(None, 0, 600, 'Red', 2).get_client_file(file))
+
+    def test_game_is_recorded_and_replayed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            constants.RECORDING_FILE = os.path.join(directory, "game.jsonl.gz")
+            try:
+                protocol = ClientHandlerProtocol(StandInAI(), 0, 600, constants.LOCAL_PLAYER_UUID)
+            finally:
+                constants.RECORDING_FILE = ""
+            initial_state_message = self.message.replace('"Red"', json.dumps(constants.LOCAL_PLAYER_UUID))
+            protocol.prepare_initial_state(JSON.parse_initial_state(initial_state_message, constants.LOCAL_PLAYER_UUID))
+            messages = [create_game_state_message(protocol.tiles, 'mid', constants.LOCAL_PLAYER_UUID, turn) for turn in range(3)]
+            protocol.client_channel_handler = FakeChannelHandler([initial_state_message] + messages)
+            protocol.relay_message_and_respond_to(Signals.GET_READY.name)
+            for turn in range(3):
+                protocol.relay_message_and_respond_to(Signals.MOVE.name)
+            protocol.end_communications()
+
+            recording = read_recording(os.path.join(directory, "game.jsonl.gz"))
+            self.assertEqual(constants.LOCAL_PLAYER_UUID, recording.uuid)
+            self.assertEqual(initial_state_message, recording.initial_state_message)
+            self.assertEqual(messages, [turn['message'] for turn in recording.turns])
+            self.assertEqual([0, 1, 2], [turn['turn'] for turn in recording.turns])
+
+            results = Replay.replay(recording, StandInAI())
+            self.assertEqual([turn['response'] for turn in recording.turns], [result['response'] for result in results])
+            self.assertTrue(all(not result['differences'] and result['time'] >= 0 for result in results))
+
+            results = Replay.replay(recording, IdleAI())
+            for turn, result in zip(recording.turns, results):
+                self.assertEqual(sorted(Replay.get_move_targets(turn['response'])), result['differences'])
+            self.assertTrue(any(result['differences'] for result in results))
+
+    @unittest.skipUnless(get_map_names(), "shipped maps are not available")
+    def test_snapshot_latencies(self):
+        recording = SnapshotBenchmark.create_recording(get_map_names()[0], 2, 600)
+        self.assertEqual(2 * len(GAME_STAGES), len(recording.turns))
+
+        latencies = SnapshotBenchmark.benchmark_snapshot(recording, StandInAI())
+        self.assertEqual(2 * len(GAME_STAGES), sum(unit_count_latencies['turns'] for unit_count_latencies in latencies.values()))
+        for unit_count_latencies in latencies.values():
+            self.assertTrue(0 <= unit_count_latencies['p50'] <= unit_count_latencies['p95'] <= unit_count_latencies['max'])
+            self.assertEqual(0, unit_count_latencies['errors'])
+        self.assertFalse(SnapshotBenchmark.is_too_slow(latencies, 600))
+        self.assertTrue(SnapshotBenchmark.is_too_slow({8: {'max': 560}}, 600))
+        self.assertFalse(SnapshotBenchmark.is_too_slow({8: {'max': 540}}, 600))
+
+        latencies = SnapshotBenchmark.benchmark_snapshot(recording, SlowAI([0, 0.06, 0, 0, 0, 0]))
+        self.assertTrue(SnapshotBenchmark.is_too_slow(latencies, 50))
+
+        name, latencies, too_slow = SnapshotBenchmark.run([SnapshotBenchmark.get_snapshot_directories()[-1]], turns=1)[0]
+        self.assertTrue(name.startswith('snap_'))
+        self.assertEqual(len(GAME_STAGES), sum(unit_count_latencies['turns'] for unit_count_latencies in latencies.values()))
+
+if __name__ == '__main__':
+    unittest.main()
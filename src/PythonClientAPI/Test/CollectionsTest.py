@@ -0,0 +1,67 @@
+from unittest import TestCase
+import time
+import unittest
+
+from PythonClientAPI.DataStructures.Collections import Queue, PriorityQueue, recursively_flatten_list
+from PythonClientAPI.Game.Enums import TileType, Team
+from PythonClientAPI.Game.World import World
+
+
+def time_full_map_search(size):
+    tiles = [[TileType.TILE for y in range(size)] for x in range(size)]
+    world = World(tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+    best = None
+    for i in range(3):
+        start_time = time.perf_counter()
+        world.get_closest_point_from((0, 0), lambda p: False)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class TestCollections(TestCase):
+
+    def test_queue_is_first_in_first_out(self):
+        queue = Queue()
+        self.assertTrue(queue.is_empty())
+        for item in [(0, 1), (2, 3), (4, 5)]:
+            queue.add(item)
+        self.assertEqual([(0, 1), (2, 3), (4, 5)], [queue.poll() for i in range(3)])
+        self.assertTrue(queue.is_empty())
+
+    def test_priority_queue_keeps_insertion_order_for_ties(self):
+        queue = PriorityQueue()
+        queue.add('b', 1)
+        queue.add('a', 0)
+        queue.add('c', 1)
+        self.assertEqual(['a', 'b', 'c'], [queue.poll() for i in range(3)])
+        self.assertTrue(queue.is_empty())
+
+    def test_recursively_flatten_list(self):
+        self.assertEqual([1, 2, 3, 4], recursively_flatten_list([[1, [2]], [], [3, 4]]))
+        self.assertEqual([5], recursively_flatten_list(5))
+        # repeated calls must not share results
+        self.assertEqual([1, 2], recursively_flatten_list([[1], [2]]))
+        self.assertEqual([1, 2], recursively_flatten_list([[1], [2]]))
+
+    def test_queue_poll_is_constant_time(self):
+        def time_fill_and_drain(count):
+            queue = Queue()
+            start_time = time.perf_counter()
+            for i in range(count):
+                queue.add(i)
+            while not queue.is_empty():
+                queue.poll()
+            return time.perf_counter() - start_time
+
+        small, large = time_fill_and_drain(50000), time_fill_and_drain(400000)
+        # 8 times as many items; a list-backed queue is quadratic here and takes far longer
+        self.assertLess(large, small * 24)
+
+    def test_full_map_search_is_linear(self):
+        small, large = time_full_map_search(60), time_full_map_search(120)
+        # 4 times as many cells
+        self.assertLess(large, small * 12)
+
+if __name__ == '__main__':
+    unittest.main()
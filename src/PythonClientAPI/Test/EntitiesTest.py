@@ -0,0 +1,42 @@
+from unittest import TestCase
+import unittest
+
+from PythonClientAPI.Benchmarks.EntitiesBenchmark import run
+from PythonClientAPI.Game.Entities import Tile, FriendlyUnit, EnemyUnit
+from PythonClientAPI.Game.Enums import Team, MoveResult
+
+
+class TestEntities(TestCase):
+
+    def test_entities_have_no_dict(self):
+        entities = [Tile((0, 0), Team.NEUTRAL, False), EnemyUnit('b', 'e0', 1, (0, 0)),
+                    FriendlyUnit('a', 'f0', 1, (0, 0), MoveResult.MOVE_SUCCESS, [])]
+        for entity in entities:
+            self.assertFalse(hasattr(entity, '__dict__'))
+            with self.assertRaises(AttributeError):
+                entity.undeclared_attribute = 1
+
+    def test_tile_equality_and_hash(self):
+        tile = Tile((3, 4), Team.FRIENDLY, False)
+        same_position = Tile((3, 4), Team.ENEMY, True)
+        self.assertEqual(tile, same_position)
+        self.assertEqual(hash(tile), hash(same_position))
+        self.assertNotEqual(tile, Tile((4, 3), Team.FRIENDLY, False))
+        self.assertNotEqual(tile, (3, 4))
+        self.assertEqual(1, len({tile, same_position}))
+
+    def test_unit_equality_and_hash(self):
+        unit = FriendlyUnit('a', 'f0', 1, (0, 0), MoveResult.MOVE_SUCCESS, [])
+        moved = FriendlyUnit('a', 'f0', 5, (1, 0), MoveResult.MOVE_SUCCESS, ['f1'])
+        self.assertEqual(unit, moved)
+        self.assertEqual(hash(unit), hash(moved))
+        self.assertNotEqual(unit, EnemyUnit('a', 'f0', 1, (0, 0)))
+        self.assertNotEqual(unit, FriendlyUnit('a', 'f1', 1, (0, 0), MoveResult.MOVE_SUCCESS, []))
+        self.assertTrue(unit < moved)
+
+    def test_benchmark_runs(self):
+        for name, count, baseline_memory, slotted_memory, baseline_time, slotted_time in run(10, 10):
+            self.assertLess(slotted_memory, baseline_memory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+from unittest import TestCase
+import json
+import unittest
+
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Benchmarks.GameStates import get_map_names, create_game_state_message
+from PythonClientAPI.Benchmarks.JSONBenchmark import run
+from PythonClientAPI.Game.Enums import TileType
+
+
+class TestJSON(TestCase):
+
+    def setUp(self):
+        self.tiles = [[TileType.TILE for y in range(11)] for x in range(13)]
+        self.tiles[4][4] = TileType.WALL
+
+    def tearDown(self):
+        JSON.set_json_decoder()
+
+    def test_fastest_decoder_is_selected(self):
+        decoders = JSON.get_json_decoders()
+        self.assertEqual('json', list(decoders)[-1])
+        self.assertIs(next(iter(decoders.values())), JSON.decode_json)
+
+    def test_unknown_decoder_is_rejected(self):
+        with self.assertRaises(ValueError):
+            JSON.set_json_decoder('not a decoder')
+
+    def test_decoders_parse_the_same_state(self):
+        message = create_game_state_message(self.tiles, 'mid', constants.LOCAL_PLAYER_UUID, 1)
+        states = []
+        for name in JSON.get_json_decoders():
+            JSON.set_json_decoder(name)
+            world = JSON.parse_game_state(message, self.tiles).world
+            states.append(([(t.position, t.is_friendly(), t.is_permanently_owned()) for t in world.get_tiles()],
+                           [(u.uuid, u.health, u.position) for u in world.api.friendlies + world.api.enemies],
+                           world.get_friendly_nest_positions(), world.get_enemy_nest_positions()))
+        self.assertTrue(all(state == states[0] for state in states))
+        self.assertEqual(13 * 11 - 1, len(states[0][0]))
+
+    def test_player_states_hold_tile_entries_as_sent(self):
+        message = create_game_state_message(self.tiles, 'mid', constants.LOCAL_PLAYER_UUID, 1)
+        players = json.loads(message)['playerUUIDToPlayerTypeMap']
+        game_state = JSON.parse_game_state(message, self.tiles)
+        for uuid, player_state in game_state.player_uuid_to_player_type_map.items():
+            self.assertEqual(players[uuid]['friendlyTilePositions'], player_state.friendly_tile_entries)
+            self.assertTrue(all(len(entry) == 3 and entry[2] in (0, 1) for entry in player_state.friendly_tile_entries))
+
+    @unittest.skipUnless(get_map_names(), "shipped maps not available")
+    def test_benchmark_runs(self):
+        results = run(get_map_names()[0], turns=1)
+        self.assertEqual(list(JSON.get_json_decoders()), [result[0] for result in results])
+
+if __name__ == '__main__':
+    unittest.main()
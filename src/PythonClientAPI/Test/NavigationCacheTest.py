@@ -0,0 +1,227 @@
+from unittest import TestCase
+import mmap
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from zipfile import ZipFile
+
+from PythonClientAPI.Game.Enums import Direction, TileType
+from PythonClientAPI.Navigation import NavigationCache as navigation_module
+from PythonClientAPI.Navigation.LazyNavigationCache import LazyNavigationCache, DEFAULT_CAPACITY
+from PythonClientAPI.Navigation.NavigationCache import NavigationCache, get_sidecar_path, write_sidecar
+from PythonClientAPI.Navigation.NavigationCompiler import get_wall_data
+
+
+def write_nav_data(path, width, height, entry):
+    data = bytearray([width, height, width, height, 2])
+    for x1 in range(width):
+        for y1 in range(height):
+            for x2 in range(width):
+                for y2 in range(height):
+                    data.extend(entry((x1, y1), (x2, y2)))
+    with ZipFile(path, 'w') as zip_file:
+        zip_file.writestr('data', bytes(data))
+
+
+class TestNavigationCache(TestCase):
+
+    def setUp(self):
+        self.width, self.height = 4, 3
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test_map.nac')
+        # direction index and distance are derived from the coordinates so every entry is distinct
+        write_nav_data(self.path, self.width, self.height,
+                       lambda p, q: ((p[0] + q[1]) % 5, p[0] * 27 + p[1] * 9 + q[0] * 3 + q[1]))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_compiled_data(self):
+        cache = NavigationCache()
+        self.assertFalse(cache.loaded)
+        cache.load_compiled_data(self.path)
+        self.assertTrue(cache.loaded)
+        self.assertEqual((self.width, self.height, self.width, self.height, 2), cache.dimensions)
+
+    def test_lookups(self):
+        cache = NavigationCache()
+        cache.load_compiled_data(self.path)
+        for x1 in range(self.width):
+            for y1 in range(self.height):
+                for x2 in range(self.width):
+                    for y2 in range(self.height):
+                        expected_direction = Direction.INDEX_TO_DIRECTION[(x1 + y2) % 5]
+                        self.assertEqual(expected_direction, cache.get_next_direction_in_path((x1, y1), (x2, y2)))
+                        self.assertEqual(x1 * 27 + y1 * 9 + x2 * 3 + y2, cache.get_distance((x1, y1), (x2, y2)))
+
+    def test_batch_lookups(self):
+        cache = NavigationCache()
+        cache.load_compiled_data(self.path)
+        positions = [(0, 0), (3, 2), (1, 1), (3, 2)]
+        targets = [(2, 1), (0, 0), (3, 2)]
+
+        backends = [None, navigation_module.numpy] if navigation_module.numpy else [None]
+        for backend in backends:
+            with mock.patch.object(navigation_module, 'numpy', backend):
+                cache._array = None
+                distances = cache.get_distances(positions, targets)
+                self.assertEqual([[cache.get_distance(p, t) for t in targets] for p in positions], distances)
+
+                directions = cache.get_next_directions_in_path(positions[:3], targets)
+                self.assertEqual([cache.get_next_direction_in_path(p, t) for p, t in zip(positions, targets)], directions)
+
+                self.assertEqual([], cache.get_next_directions_in_path([], []))
+                self.assertEqual([[], []], cache.get_distances(positions[:2], []))
+
+    def test_truncated_data(self):
+        with ZipFile(self.path, 'w') as zip_file:
+            zip_file.writestr('data', bytes([2, 2, 2, 2, 2, 0, 0]))
+        cache = NavigationCache()
+        self.assertRaises(EOFError, cache.load_compiled_data, self.path)
+        self.assertFalse(cache.loaded)
+
+    def test_load_navigation_data_writes_sidecar(self):
+        cache = NavigationCache()
+        cache.load_navigation_data(self.path)
+        self.assertTrue(os.path.isfile(get_sidecar_path(self.path)))
+        self.assertIsInstance(cache.navigation_data.obj, mmap.mmap)
+
+        mapped_cache = NavigationCache()
+        self.assertTrue(mapped_cache.load_mapped_data(get_sidecar_path(self.path), self.path))
+        compiled_cache = NavigationCache()
+        compiled_cache.load_compiled_data(self.path)
+        self.assertEqual(bytes(compiled_cache.navigation_data), bytes(mapped_cache.navigation_data))
+        self.assertEqual(compiled_cache.get_distance((3, 2), (1, 0)), mapped_cache.get_distance((3, 2), (1, 0)))
+
+    def test_stale_sidecar_is_rejected(self):
+        write_sidecar(self.path, get_sidecar_path(self.path))
+        write_nav_data(self.path, self.width, self.height, lambda p, q: (0, 7))
+
+        cache = NavigationCache()
+        self.assertFalse(cache.load_mapped_data(get_sidecar_path(self.path), self.path))
+
+        cache.load_navigation_data(self.path)
+        self.assertTrue(cache.loaded)
+        self.assertEqual(7, cache.get_distance((0, 0), (3, 2)))
+
+    def test_unreadable_sidecar_falls_back_to_compiled_data(self):
+        write_sidecar(self.path, get_sidecar_path(self.path))
+        cache = NavigationCache()
+        with mock.patch.object(navigation_module.mmap, 'mmap', side_effect=OSError("locked")):
+            cache.load_navigation_data(self.path)
+        self.assertTrue(cache.loaded)
+        self.assertIsInstance(cache.navigation_data.obj, bytes)
+
+    def test_truncated_sidecar_is_closed_and_rewritten(self):
+        write_sidecar(self.path, get_sidecar_path(self.path))
+        with open(get_sidecar_path(self.path), 'r+b') as f:
+            f.truncate(os.path.getsize(get_sidecar_path(self.path)) - 1)
+
+        mapped_files = []
+        original_mmap = mmap.mmap
+        def create_mmap(*args, **kwargs):
+            mapped_files.append(original_mmap(*args, **kwargs))
+            return mapped_files[-1]
+
+        cache = NavigationCache()
+        with mock.patch.object(navigation_module.mmap, 'mmap', side_effect=create_mmap):
+            self.assertFalse(cache.load_mapped_data(get_sidecar_path(self.path), self.path))
+        self.assertTrue(mapped_files[0].closed)
+
+        cache.load_navigation_data(self.path)
+        self.assertTrue(cache.loaded)
+        self.assertIsInstance(cache.navigation_data.obj, mmap.mmap)
+
+    def test_load_navigation_data_without_sidecar(self):
+        cache = NavigationCache()
+        cache.load_navigation_data(self.path, use_sidecar=False)
+        self.assertTrue(cache.loaded)
+        self.assertFalse(os.path.exists(get_sidecar_path(self.path)))
+
+class TestLazyNavigationCache(TestCase):
+
+    def setUp(self):
+        self.tiles = [[TileType.TILE for y in range(4)] for x in range(5)]
+        self.tiles[2][1] = TileType.WALL
+
+    def test_lookups(self):
+        cache = LazyNavigationCache()
+        cache.bind(self.tiles)
+        self.assertEqual(2, cache.get_distance((2, 0), (2, 2)))
+        self.assertEqual(Direction.NORTH, cache.get_next_direction_in_path((2, 0), (2, 2)))
+        self.assertEqual(Direction.NOWHERE, cache.get_next_direction_in_path((2, 2), (2, 2)))
+        self.assertEqual(0, cache.get_distance((2, 0), (2, 1)))
+        self.assertEqual(2, cache.get_row_count())
+
+    def test_least_recently_used_row_is_evicted(self):
+        cache = LazyNavigationCache(capacity=2)
+        cache.bind(self.tiles)
+        cache.get_distance((0, 0), (1, 1))
+        cache.get_distance((0, 0), (3, 3))
+        cache.get_distance((0, 0), (1, 1))
+        cache.get_distance((0, 0), (4, 0))
+        self.assertEqual(2, cache.get_row_count())
+        self.assertEqual([(1 * 4 + 1), (4 * 4 + 0)], list(cache._rows.keys()))
+
+    def test_every_target_of_a_shipped_map_size_fits(self):
+        cache = LazyNavigationCache()
+        cache.bind([[TileType.TILE for y in range(19)] for x in range(19)])
+        targets = [(x, y) for x in range(19) for y in range(19)]
+        for target in targets:
+            cache.get_distance((0, 0), target)
+        rows = dict(cache._rows)
+        for target in targets:
+            cache.get_distance((0, 0), target)
+        self.assertEqual(19 * 19, cache.get_row_count())
+        self.assertTrue(all(cache._rows[index] is row for index, row in rows.items()))
+
+        cache.bind([[TileType.TILE for y in range(100)] for x in range(100)])
+        self.assertEqual(DEFAULT_CAPACITY, cache.row_capacity)
+
+    def test_rebinding_keeps_rows_until_walls_change(self):
+        cache = LazyNavigationCache()
+        cache.bind(self.tiles)
+        cache.get_distance((0, 0), (1, 1))
+        cache.bind([list(column) for column in self.tiles])
+        self.assertEqual(1, cache.get_row_count())
+
+        tiles = [list(column) for column in self.tiles]
+        tiles[2][1] = TileType.TILE
+        cache.bind(tiles)
+        self.assertEqual(0, cache.get_row_count())
+        self.assertEqual(2, cache.get_distance((2, 0), (2, 2)))
+
+    def test_alternating_between_copies_of_a_map_reads_walls_once_per_copy(self):
+        cache = LazyNavigationCache()
+        copies = [self.tiles, [list(column) for column in self.tiles]]
+        with mock.patch('PythonClientAPI.Navigation.LazyNavigationCache.get_wall_data', wraps=get_wall_data) as wall_data:
+            for i in range(10):
+                cache.bind(copies[i % 2])
+                cache.get_distance((0, 0), (1, 1))
+        self.assertEqual(2, wall_data.call_count)
+        self.assertEqual(1, cache.get_row_count())
+
+    def test_concurrent_lookups(self):
+        cache = LazyNavigationCache(capacity=3)
+        cache.bind(self.tiles)
+        targets = [(x, y) for x in range(5) for y in range(4) if (x, y) != (2, 1)]
+        errors = []
+
+        def look_up(offset):
+            try:
+                for i in range(300):
+                    target = targets[(i + offset) % len(targets)]
+                    self.assertEqual(0, cache.get_distance(target, target))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=look_up, args=(offset,)) for offset in range(8)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(3, cache.get_row_count())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+from unittest import TestCase
+import os
+import tempfile
+import unittest
+from zipfile import ZipFile
+
+from PythonClientAPI.Game.Enums import TileType, Team
+from PythonClientAPI.Game.World import World
+from PythonClientAPI.Navigation.NavigationCache import NavigationCache, navigation_cache
+from PythonClientAPI.Navigation.NavigationCompiler import compile_nav_data, get_map_hash, load_or_compile, read_bitmap_tiles
+
+MAPS_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'LUMINIS', 'Maps')
+
+
+class TestNavigationCompiler(TestCase):
+
+    def setUp(self):
+        self.width, self.height = 7, 5
+        self.tiles = [[TileType.TILE for y in range(self.height)] for x in range(self.width)]
+        for y in range(self.height - 1):
+            self.tiles[3][y] = TileType.WALL
+        self.tiles[0][4] = TileType.WALL
+        self.tiles[6][4] = TileType.WALL
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        navigation_cache.__init__()
+
+    def test_distances_match_shortest_paths(self):
+        cache = NavigationCache()
+        cache.navigation_data = cache.deserialize_nav_data(compile_nav_data(self.tiles))
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+
+        points = [(x, y) for x in range(self.width) for y in range(self.height)]
+        for start in points:
+            for end in points:
+                path = None if start == end else world.get_shortest_path(start, end, None)
+                self.assertEqual(len(path) if path else 0, cache.get_distance(start, end))
+                if path:
+                    # ties may be broken differently than A*, but the next step must still be on a shortest path
+                    next_point = world.get_neighbours(start)[cache.get_next_direction_in_path(start, end)]
+                    self.assertEqual(len(path) - 1, cache.get_distance(next_point, end))
+
+    def test_multiple_processes(self):
+        self.assertEqual(compile_nav_data(self.tiles), compile_nav_data(self.tiles, 2))
+
+    @unittest.skipUnless(os.path.isdir(MAPS_DIRECTORY), "shipped maps not available")
+    def test_matches_shipped_maps(self):
+        for name in ['Open Map', 'Quadrants']:
+            tiles = read_bitmap_tiles(os.path.join(MAPS_DIRECTORY, name + '.bmp'))
+            with ZipFile(os.path.join(MAPS_DIRECTORY, name + '.nac')) as zip_file:
+                self.assertEqual(zip_file.read('data'), compile_nav_data(tiles))
+
+    def test_load_or_compile(self):
+        file = load_or_compile(self.tiles, self.directory.name)
+        self.assertEqual(os.path.join(self.directory.name, get_map_hash(self.tiles) + '.nac'), file)
+        self.assertTrue(navigation_cache.loaded)
+        self.assertEqual(4, navigation_cache.get_distance((2, 0), (4, 0)))
+
+        modified_time = os.path.getmtime(file)
+        self.assertEqual(file, load_or_compile(self.tiles, self.directory.name))
+        self.assertEqual(modified_time, os.path.getmtime(file))
+
+    def test_large_maps_are_not_compiled(self):
+        self.assertIsNone(load_or_compile(self.tiles, self.directory.name, cell_limit=self.width * self.height - 1))
+        self.assertFalse(navigation_cache.loaded)
+        self.assertEqual([], os.listdir(self.directory.name))
+
+        file = load_or_compile(self.tiles, self.directory.name, cell_limit=self.width * self.height)
+        self.assertTrue(navigation_cache.loaded)
+        navigation_cache.__init__()
+        # data compiled earlier is still loaded, however large the map
+        self.assertEqual(file, load_or_compile(self.tiles, self.directory.name, cell_limit=1))
+        self.assertTrue(navigation_cache.loaded)
+
+    def test_map_hash(self):
+        other_tiles = [list(column) for column in self.tiles]
+        self.assertEqual(get_map_hash(self.tiles), get_map_hash(other_tiles))
+        other_tiles[1][1] = TileType.WALL
+        self.assertNotEqual(get_map_hash(self.tiles), get_map_hash(other_tiles))
+
+if __name__ == '__main__':
+    unittest.main()
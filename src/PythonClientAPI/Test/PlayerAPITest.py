@@ -1,10 +1,15 @@
 from unittest import TestCase
 import unittest
 
+from PythonClientAPI.Benchmarks import PlayerAPIBenchmark
+from PythonClientAPI.Benchmarks.GameStates import GAME_STAGES, get_map_names
+from PythonClientAPI.DataStructures.Collections import Queue
 from PythonClientAPI.Game.Entities import Tile, FriendlyUnit, EnemyUnit
 from PythonClientAPI.Game.Enums import TileType, Team, Direction
 from PythonClientAPI.Game.PlayerAPI import PlayerAPI
+from PythonClientAPI.Game.InstrumentedPlayerAPI import InstrumentedPlayerAPI
 from PythonClientAPI.Game.World import World
+from PythonClientAPI.Game.OwnershipGrid import OwnershipGrid, FRIENDLY
 from PythonClientAPI.Navigation.NavigationCache import navigation_cache
 
 
@@ -57,6 +62,16 @@ class TestPlayerAPI(TestCase):
             self.assertEqual(expected[direction], actual[direction])
         self.assertEqual(len(expected), len(actual))
 
+    def test_neighbour_table(self):
+        self.tiles[1][0] = TileType.WALL
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+        table = world.api.neighbour_table
+        self.assertEqual(((0, 18), (1, 0), (0, 1), (18, 0)), table.neighbours[(0, 0)])
+        self.assertEqual(((0, 18), (0, 1), (18, 0)), table.open_neighbours[(0, 0)])
+
+        next_world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+        self.assertIs(table, next_world.api.neighbour_table)
+
     def test_get_tiles_around(self):
         self.tiles[10][8] = TileType.WALL
         world = World(self.tiles, [], [], {Team.FRIENDLY: [Tile((9, 7), Team.FRIENDLY, False)], Team.ENEMY: [Tile((11, 8), Team.ENEMY, False)]}, {Team.FRIENDLY: [], Team.ENEMY: []})
@@ -83,6 +98,17 @@ class TestPlayerAPI(TestCase):
         self.assertEqual((10, 7), world.get_next_point_in_shortest_path((9, 7), (9, 11)))
         self.assertEqual(8, world.get_shortest_path_distance((9, 7), (9, 11)))
 
+    def test_path_finding_without_navigation_data(self):
+        for y in range(1, self.height):
+            self.tiles[9][y] = TileType.WALL
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+        self.assertFalse(navigation_cache.loaded)
+        self.assertEqual((8, 1), world.get_next_point_in_shortest_path((8, 2), (10, 2)))
+        self.assertEqual(6, world.get_shortest_path_distance((8, 2), (10, 2)))
+        self.assertEqual(0, world.get_shortest_path_distance((8, 2), (8, 2)))
+        self.assertEqual((8, 2), world.get_next_point_in_shortest_path((8, 2), (9, 2)))
+        self.assertEqual(0, world.get_shortest_path_distance((8, 2), (9, 2)))
+
     def test_get_nest_positions(self):
         expected = {Team.FRIENDLY: [(1, 12), (3, 12), (6, 13)], Team.ENEMY: [(6, 18), (8, 16)]}
         expected['all'] = expected[Team.FRIENDLY] + expected[Team.ENEMY]
@@ -94,6 +120,106 @@ class TestPlayerAPI(TestCase):
         for team in [Team.FRIENDLY, Team.ENEMY, 'all']:
             self.assertEqual(set(expected[team]), set(actual[team]))
 
+    def test_ownership_grid(self):
+        self.tiles[2][2] = TileType.WALL
+        team_tiles = {Team.FRIENDLY: [Tile((0, 0), Team.FRIENDLY, True)], Team.ENEMY: [Tile((1, 0), Team.ENEMY, False)]}
+        world = World(self.tiles, [], [], team_tiles, {Team.FRIENDLY: [], Team.ENEMY: []})
+        grid = world.ownership_grid
+        self.assertEqual(Team.FRIENDLY, grid.get_team((0, 0)))
+        self.assertEqual(Team.ENEMY, grid.get_team((1, 0)))
+        self.assertEqual(Team.NEUTRAL, grid.get_team((0, 1)))
+        self.assertIsNone(grid.get_team((2, 2)))
+
+        self.assertTrue(world.get_tile_at((0, 0)).is_permanently_owned())
+        self.assertTrue(world.get_tile_at((0, 1)).is_neutral())
+        self.assertIsNone(world.get_tile_at((2, 2)))
+        self.assertIsNone(world.get_tile_at((self.width, 0)))
+        self.assertEqual(self.width * self.height - 3, len(world.get_neutral_tiles()))
+        self.assertTrue(all(grid.get_tile(tile.position) is tile for tile in world.get_neutral_tiles()))
+
+    def test_ownership_grid_creates_tiles_lazily(self):
+        grid = OwnershipGrid(self.tiles, {})
+        grid.update({Team.FRIENDLY: [[0, 0, 1], [0, 1, 0]], Team.ENEMY: [[1, 0, 0]]})
+        self.assertTrue(all(tile is None for tile in grid.tiles))
+        self.assertEqual(FRIENDLY, grid.get_owner((0, 0)))
+        self.assertTrue(grid.is_permanently_owned((0, 0)))
+
+        world = World(self.tiles, [], [], {}, {Team.FRIENDLY: [], Team.ENEMY: []}, grid)
+        tiles_around = world.get_tiles_around((0, 0))
+        self.assertEqual(4, len(tiles_around))
+        self.assertEqual(4, sum(1 for tile in grid.tiles if tile is not None))
+        self.assertEqual([(0, 0), (0, 1)], [tile.position for tile in world.get_friendly_tiles()])
+        self.assertIs(tiles_around[Direction.EAST], world.get_enemy_tiles()[0])
+
+        grid.update({Team.FRIENDLY: [[0, 0, 1]], Team.ENEMY: [[1, 0, 0], [0, 1, 0]]})
+        self.assertIsNone(grid.tiles[grid.get_index((0, 1))])
+        self.assertTrue(grid.get_tile((0, 1)).is_enemy())
+        self.assertIsNotNone(grid.tiles[grid.get_index((0, 0))])
+
+    def test_searches_from_wrapped_points(self):
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+        self.assertEqual(world.get_shortest_path((0, 0), (3, 3), None), world.get_shortest_path((-19, 19), (3, 3), None))
+        self.assertEqual([(17, 0)], world.get_shortest_path((-1, 0), (-2, 0), None))
+        self.assertEqual((18, 1), world.get_closest_point_from((-1, 0), lambda point: point[1] == 1))
+
+    def test_partial_nest_clusters_are_not_carried_over(self):
+        nests = {Team.FRIENDLY: [(1, 1), (8, 8)], Team.ENEMY: [(4, 12)]}
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, nests)
+        next_apis = []
+
+        class NextTurnQueue(Queue):
+            def poll(queue):
+                # the next turn starts while this one is still building its clusters
+                next_apis.append(PlayerAPI(self.tiles, [], [], {}, dict(nests), previous_api=world.api))
+                return Queue.poll(queue)
+
+        world.api.queue_class = NextTurnQueue
+        clusters = world.get_friendly_nest_clusters()
+        self.assertEqual([{(1, 1)}, {(8, 8)}], clusters)
+        self.assertTrue(next_apis)
+        self.assertTrue(all(api._nest_clusters_cache is None for api in next_apis))
+        self.assertIs(world.api._nest_clusters_cache,
+                      PlayerAPI(self.tiles, [], [], {}, dict(nests), previous_api=world.api)._nest_clusters_cache)
+
+    def test_instrumented_api_counts_calls_and_nodes(self):
+        nests = {Team.FRIENDLY: [], Team.ENEMY: []}
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, nests)
+        self.assertIsNone(world.get_api_statistics())
+
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, nests, api_class=InstrumentedPlayerAPI)
+        path = world.get_shortest_path((0, 0), (3, 3), None)
+        world.get_shortest_path((0, 0), (3, 3), None)
+        self.assertEqual(6, len(path))
+
+        statistics = world.get_api_statistics()['get_shortest_path']
+        self.assertEqual(2, statistics['calls'])
+        self.assertGreaterEqual(statistics['nodes_expanded'], 2 * len(path))
+        self.assertEqual(2, sum(statistics['latencies'].values()))
+        self.assertGreaterEqual(statistics['time'], 0)
+
+    @unittest.skipUnless(get_map_names(), "shipped maps are not available")
+    def test_benchmark_report(self):
+        map_name = get_map_names()[0]
+        report = PlayerAPIBenchmark.run([map_name], turns=1)
+        self.assertEqual(set(GAME_STAGES), set(report[map_name]))
+        for timings in report[map_name].values():
+            self.assertEqual(PlayerAPIBenchmark.QUERIES, list(timings))
+            self.assertTrue(all(elapsed >= 0 for elapsed in timings.values()))
+
+        self.assertEqual([], PlayerAPIBenchmark.find_regressions(report, report))
+        baseline = {map_name: {'late': {'get_shortest_path': report[map_name]['late']['get_shortest_path'] / 2 - 1}}}
+        regressions = PlayerAPIBenchmark.find_regressions(report, baseline)
+        self.assertEqual([(map_name, 'late', 'get_shortest_path')], [regression[:3] for regression in regressions])
+
+    def test_get_tiles_does_not_accumulate(self):
+        team_tiles = {Team.FRIENDLY: [Tile((0, 0), Team.FRIENDLY, False)], Team.ENEMY: [Tile((1, 0), Team.ENEMY, False)]}
+        nests = {Team.FRIENDLY: [(1, 12)], Team.ENEMY: [(6, 18)]}
+        for turn in range(3):
+            world = World(self.tiles, [], [], dict(team_tiles), nests)
+            for call in range(3):
+                self.assertEqual(self.width * self.height, len(world.get_tiles()))
+                self.assertEqual(2, len(world.get_nest_positions()))
+
     def test_get_friendly_tiles_around(self):
         self.tiles[8][8] = TileType.WALL
 
@@ -152,5 +278,43 @@ class TestPlayerAPI(TestCase):
         self.assertEqual((3,1), world.get_closest_enemy_tile_from((2,1), None).position)
         self.assertEqual((2,18), world.get_closest_capturable_tile_from((2,1), None).position)
 
+    def test_distance_fields(self):
+        self.tiles[3][0] = TileType.WALL
+        enemies = [EnemyUnit("enemy", "test1", 1, (5, 0)), EnemyUnit("enemy", "test2", 1, (10, 10))]
+        team_tiles = {Team.FRIENDLY: [Tile(p, Team.FRIENDLY, False) for p in [(1, 0), (2, 0)]],
+                      Team.ENEMY: [Tile(p, Team.ENEMY, True) for p in [(0, 1)]]}
+        world = World(self.tiles, [], enemies, team_tiles, {Team.FRIENDLY: [], Team.ENEMY: [(0, 5)]})
+
+        field = world.get_enemy_distance_field()
+        self.assertIs(field, world.get_enemy_distance_field())
+        self.assertEqual(enemies[0], field.get_nearest((4, 1)))
+        self.assertEqual(5, field.get_distance((2, 0)))
+        self.assertEqual(enemies[1], field.get_nearest((9, 9)))
+        self.assertIsNone(field.get_distance((3, 0)))
+
+        field = world.get_capturable_tile_distance_field()
+        self.assertEqual((0, 0), field.get_nearest((1, 0)).position)
+        self.assertEqual(0, field.get_distance((0, 2)))
+        self.assertEqual(1, field.get_distance((2, 0)))
+
+        self.assertEqual(2, world.get_enemy_nest_distance_field().get_distance((0, 3)))
+        self.assertIsNone(world.get_friendly_nest_distance_field().get_distance((0, 3)))
+
+        field = world.get_distance_field([(0, 0), (0, 18)])
+        for x in range(self.width):
+            for y in range(self.height):
+                if world.is_wall((x, y)): continue
+                closest = world.get_closest_point_from((x, y), lambda p: p in [(0, 0), (0, 18)])
+                expected = len(world.get_shortest_path((x, y), closest, None)) - (1 if closest == (x, y) else 0)
+                self.assertEqual(expected, field.get_distance((x, y)))
+
+    def test_distance_field_ignores_wall_sources(self):
+        self.tiles[5][5] = TileType.WALL
+        world = World(self.tiles, [], [], {Team.FRIENDLY: [], Team.ENEMY: []}, {Team.FRIENDLY: [], Team.ENEMY: []})
+        field = world.get_distance_field([(5, 5), (0, 0)])
+        self.assertIsNone(field.get_distance((5, 5)))
+        self.assertEqual(9, field.get_distance((5, 4)))
+        self.assertEqual((0, 0), field.get_nearest((5, 6)))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
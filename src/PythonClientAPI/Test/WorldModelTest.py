@@ -0,0 +1,102 @@
+from unittest import TestCase
+import json
+import random
+import unittest
+
+import PythonClientAPI.Configurator.Constants as constants
+import PythonClientAPI.Game.JSON as JSON
+from PythonClientAPI.Game.Enums import TileType, Team
+from PythonClientAPI.Game.OwnershipGrid import NEUTRAL
+from PythonClientAPI.Game.WorldModel import WorldModel
+
+
+def create_game_state_message(random_generator, open_positions, turn):
+    def as_player(positions, nests, unit_prefix):
+        return {'friendlyUnits': [{'team': unit_prefix, 'uuid': unit_prefix + str(i), 'LF': 1 + i,
+                                   'position': {'x': p[0], 'y': p[1]}, 'lastMoveResult': 'MOVE_SUCCESS',
+                                   'mergedUnitUuids': []} for i, p in enumerate(positions[:5])],
+                'friendlyTilePositions': [[p[0], p[1], 1 if (p[0] + p[1] + turn) % 7 == 0 else 0] for p in positions],
+                'friendlyNestPositions': [list(p) for p in nests]}
+
+    positions = list(open_positions)
+    random_generator.shuffle(positions)
+    owned = len(positions) * turn // 12
+    friendly, enemy = positions[:owned // 2], positions[owned // 2:owned]
+    nests = positions[-4:] if turn < 3 else positions[-3:]
+    return json.dumps({'playerUUIDToPlayerTypeMap': {constants.LOCAL_PLAYER_UUID: as_player(friendly, nests[:2], 'f'),
+                                                     'enemy': as_player(enemy, nests[2:], 'e')},
+                       'playerIndexToUUIDMap': {'0': constants.LOCAL_PLAYER_UUID, '1': 'enemy'}})
+
+
+class TestWorldModel(TestCase):
+
+    def setUp(self):
+        self.width, self.height = 13, 11
+        self.tiles = [[TileType.TILE for y in range(self.height)] for x in range(self.width)]
+        for x in range(3, 9):
+            self.tiles[x][5] = TileType.WALL
+        self.open_positions = [(x, y) for x in range(self.width) for y in range(self.height) if self.tiles[x][y] == TileType.TILE]
+
+    def assertSameWorld(self, expected, actual):
+        def describe(tiles):
+            return [(t.position, t.is_friendly(), t.is_enemy(), t.is_neutral(), t.is_permanently_owned()) for t in tiles]
+
+        self.assertEqual(describe(expected.get_friendly_tiles()), describe(actual.get_friendly_tiles()))
+        self.assertEqual(describe(expected.get_enemy_tiles()), describe(actual.get_enemy_tiles()))
+        self.assertEqual(describe(expected.get_neutral_tiles()), describe(actual.get_neutral_tiles()))
+        self.assertEqual(sorted(describe(expected.get_tiles())), sorted(describe(actual.get_tiles())))
+        self.assertEqual(sorted(describe(expected.get_position_to_tile_dict().values())),
+                         sorted(describe(actual.get_position_to_tile_dict().values())))
+        self.assertEqual(expected.get_friendly_nest_clusters(), actual.get_friendly_nest_clusters())
+        self.assertEqual(expected.get_enemy_nest_clusters(), actual.get_enemy_nest_clusters())
+        for position in self.open_positions:
+            self.assertEqual(describe([expected.get_tile_at(position)]), describe([actual.get_tile_at(position)]))
+            for search in ('get_closest_capturable_tile_from', 'get_closest_neutral_tile_from', 'get_closest_enemy_tile_from'):
+                expected_tile = getattr(expected, search)(position, None)
+                actual_tile = getattr(actual, search)(position, None)
+                self.assertEqual(expected_tile and expected_tile.position, actual_tile and actual_tile.position)
+
+    def test_incremental_state_matches_rebuilt_state(self):
+        random_generator = random.Random(7)
+        world_model = WorldModel(self.tiles)
+        for turn in range(1, 11):
+            message = create_game_state_message(random_generator, self.open_positions, turn)
+            expected = JSON.parse_game_state(message, self.tiles)
+            actual = JSON.parse_game_state(message, self.tiles, world_model)
+            self.assertSameWorld(expected.world, actual.world)
+            self.assertEqual(expected.enemy_uuid, actual.enemy_uuid)
+            self.assertEqual([u.uuid for u in expected.world.api.friendlies], [u.uuid for u in actual.world.api.friendlies])
+
+    def test_unchanged_tiles_are_kept(self):
+        random_generator = random.Random(3)
+        world_model = WorldModel(self.tiles)
+        message = create_game_state_message(random_generator, self.open_positions, 4)
+
+        first = JSON.parse_game_state(message, self.tiles, world_model).world
+        tiles = list(first.get_tiles())
+        clusters = first.get_friendly_nest_clusters()
+
+        second = JSON.parse_game_state(message, self.tiles, world_model).world
+        self.assertTrue(all(a is b for a, b in zip(tiles, second.get_tiles())))
+        self.assertTrue(all(a is b for a, b in zip(first.get_neutral_tiles(), second.get_neutral_tiles())))
+        self.assertIs(clusters, second.get_friendly_nest_clusters())
+        self.assertIsNot(first.get_unit('f0'), second.get_unit('f0'))
+
+    def test_previous_world_keeps_its_ownership(self):
+        random_generator = random.Random(5)
+        world_model = WorldModel(self.tiles)
+        first_message = create_game_state_message(random_generator, self.open_positions, 3)
+        first = JSON.parse_game_state(first_message, self.tiles, world_model).world
+        first.get_position_to_tile_dict()
+
+        JSON.parse_game_state(create_game_state_message(random_generator, self.open_positions, 9), self.tiles, world_model)
+        self.assertSameWorld(JSON.parse_game_state(first_message, self.tiles).world, first)
+
+    def test_neutral_tiles_are_copied(self):
+        grid = WorldModel(self.tiles).ownership_grid
+        neutral_tiles = grid.get_team_tiles(NEUTRAL)
+        neutral_tiles.clear()
+        self.assertEqual(len(self.open_positions), len(grid.get_team_tiles(NEUTRAL)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@ import imp
 from PythonClientAPI.Communication.ClientHandlerProtocol import *
 import PythonClientAPI.Configurator.Constants as constants
 import PythonClientAPI.Communication.CommunicatorConstants as cc
-from PythonClientAPI.Game.JSON import parse_config
+from PythonClientAPI.Game.JSON import parse_config, set_json_decoder
 from PythonClientAPI.Navigation import NavigationCache
 
 
@@ -43,6 +43,23 @@ if __name__ == '__main__':
             constants.LOCAL_PLAYER_UUID = sys.argv[i * 2 + 1]
         elif sys.argv[i * 2] == "-cp":
             constants.PLAYER_AI_PATH = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-np":
+            constants.NAVIGATION_COMPILER_PROCESSES = int(sys.argv[i * 2 + 1])
+        elif sys.argv[i * 2] == "-jd":
+            set_json_decoder(sys.argv[i * 2 + 1])
+        elif sys.argv[i * 2] == "-prof":
+            constants.PROFILE_DIRECTORY = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-tm":
+            constants.TIMINGS_FILE = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-as":
+            constants.API_STATISTICS_FILE = sys.argv[i * 2 + 1]
+        elif sys.argv[i * 2] == "-rec":
+            constants.RECORDING_FILE = sys.argv[i * 2 + 1]
+
+    if constants.PROFILE_DIRECTORY:
+        os.makedirs(constants.PROFILE_DIRECTORY, exist_ok=True)
+        if not constants.TIMINGS_FILE:
+            constants.TIMINGS_FILE = os.path.join(constants.PROFILE_DIRECTORY, "timings.jsonl")
 
     if player_index == -1:
         if constants.LOCAL_PLAYER_UUID == "Red":
@@ -71,9 +88,10 @@ if __name__ == '__main__':
         pass
 
     if map_cache_path == '' or not os.path.isfile(map_cache_path):
-        print("Could not find/load map navigation data. Path-finding may be very slow!", file=sys.stderr)
+        print("Could not find/load map navigation data. It will be compiled when the game starts.", file=sys.stderr)
+        constants.NAVIGATION_CACHE_DIRECTORY = cwd + "Maps/"
     else:
-        NavigationCache.navigation_cache.load_compiled_data(map_cache_path)
+        NavigationCache.navigation_cache.load_navigation_data(map_cache_path)
     cache = NavigationCache.navigation_cache
     UUIDForAi = constants.LOCAL_PLAYER_UUID
     print("Welcome " + UUIDForAi)